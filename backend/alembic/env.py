@@ -31,12 +31,20 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Database objects created by hand-written migrations and deliberately left off the models.
+UNMAPPED_OBJECTS = {("column", "search_vector"), ("index", "ix_posts_search_vector")}
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return (type_, name) not in UNMAPPED_OBJECTS
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -45,7 +53,7 @@ def run_migrations_offline() -> None:
 
 
 def _do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,29 @@
+"""add composite index for post listing
+
+Revision ID: 0011_posts_listing_index
+Revises: 0010_add_post_media_image_url
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0011_posts_listing_index"
+down_revision: str | None = "0010_add_post_media_image_url"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_posts_published_created_at_id",
+        "posts",
+        ["published", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_published_created_at_id", table_name="posts")
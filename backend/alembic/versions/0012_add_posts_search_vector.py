@@ -0,0 +1,35 @@
+"""add generated tsvector column and GIN index for post search
+
+Revision ID: 0012_posts_search_vector
+Revises: 0011_posts_listing_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0012_posts_search_vector"
+down_revision: str | None = "0011_posts_listing_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Weighted so title matches rank above excerpt matches, which rank above body matches. Must
+    # stay in step with SEARCH_CONFIG in app/search.py.
+    op.execute(
+        """
+        ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(content, '')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index("ix_posts_search_vector", "posts", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_search_vector", table_name="posts")
+    op.drop_column("posts", "search_vector")
@@ -0,0 +1,30 @@
+"""add rendered content_html to posts and pages
+
+Revision ID: 0013_content_html
+Revises: 0012_posts_search_vector
+Create Date: 2026-10-18 00:00:00.000000
+
+Existing rows stay null until scripts/render_content.py fills them in; until then the public
+endpoints render on the fly.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0013_content_html"
+down_revision: str | None = "0012_posts_search_vector"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("posts", sa.Column("content_html", sa.Text(), nullable=True))
+    op.add_column("pages", sa.Column("content_html", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("pages", "content_html")
+    op.drop_column("posts", "content_html")
@@ -0,0 +1,26 @@
+"""add photo_srcset to site_profile
+
+Revision ID: 0014_profile_photo_srcset
+Revises: 0013_content_html
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision: str = "0014_profile_photo_srcset"
+down_revision: str | None = "0013_content_html"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("site_profile", sa.Column("photo_srcset", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("site_profile", "photo_srcset")
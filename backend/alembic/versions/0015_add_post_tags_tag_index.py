@@ -0,0 +1,25 @@
+"""add (tag_id, post_id) index to post_tags
+
+Revision ID: 0015_post_tags_tag_index
+Revises: 0014_profile_photo_srcset
+Create Date: 2026-10-18 00:00:00.000000
+
+The primary key is (post_id, tag_id), which can't serve lookups by tag.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0015_post_tags_tag_index"
+down_revision: str | None = "0014_profile_photo_srcset"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_post_tags_tag_id_post_id", "post_tags", ["tag_id", "post_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_tags_tag_id_post_id", table_name="post_tags")
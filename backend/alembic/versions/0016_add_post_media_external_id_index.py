@@ -0,0 +1,23 @@
+"""add (media_type, external_id) index to post_media
+
+Revision ID: 0016_post_media_external_index
+Revises: 0015_post_tags_tag_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "0016_post_media_external_index"
+down_revision: str | None = "0015_post_tags_tag_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_post_media_media_type_external_id", "post_media", ["media_type", "external_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_post_media_media_type_external_id", table_name="post_media")
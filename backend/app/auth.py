@@ -1,3 +1,7 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
 
 import bcrypt
@@ -6,10 +10,18 @@ from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import TTLCache
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
 
+# sha256(token) -> (user snapshot, token expiry as a unix timestamp). Lets repeat admin requests skip
+# both the JWT verification and the users lookup; dropped on logout and password change.
+_session_cache: TTLCache[tuple[User, float]] = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
@@ -19,6 +31,21 @@ def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop; the cap bounds
+# how much CPU a burst of login attempts can take from everything else.
+_bcrypt_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt")
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(UTC) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -37,6 +64,15 @@ async def get_current_user(
     )
     if access_token is None:
         raise credentials_exception
+    key = _token_key(access_token)
+    cached = _session_cache.get(key)
+    if cached is not None:
+        cached_user, expires = cached
+        if expires > time.time():
+            return cached_user
+        _session_cache.pop(key)
+        raise credentials_exception
+
     try:
         payload = jwt.decode(access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
@@ -48,4 +84,23 @@ async def get_current_user(
     user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
     if user is None:
         raise credentials_exception
+    _session_cache.set(key, (_snapshot(user), float(payload["exp"])))
     return user
+
+
+def forget_session(access_token: str | None) -> None:
+    if access_token is not None:
+        _session_cache.pop(_token_key(access_token))
+
+
+def forget_all_sessions() -> None:
+    _session_cache.clear()
+
+
+def _token_key(access_token: str) -> str:
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def _snapshot(user: User) -> User:
+    # A detached copy, so the cached user never drags a closed request session along with it.
+    return User(id=user.id, username=user.username, hashed_password=user.hashed_password, created_at=user.created_at)
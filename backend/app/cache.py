@@ -0,0 +1,402 @@
+"""In-process caches.
+
+Everything here is per-process and bounded in size or age. For the public read path the admin
+router also invalidates whatever it writes, so readers see changes immediately.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, NamedTuple
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.conditional import is_not_modified
+from app.config import settings
+from app.database import note_write
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry[V](NamedTuple):
+    value: V
+    expires: float
+    size: int
+
+
+class TTLCache[V]:
+    """An LRU mapping bounded by entry count and, optionally, total size, whose entries expire after ``ttl``.
+
+    Expired entries are dropped lazily when looked up, and in a full sweep at most every
+    ``sweep_interval`` seconds on write so keys that are never read again don't linger. With
+    ``stale_ttl`` set, an expired entry is kept that much longer so ``get_stale`` can still serve
+    it while a refresh is under way.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+        sweep_interval: float = 60.0,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("max_bytes needs a sizeof function")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.sweep_interval = sweep_interval
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.total_bytes = 0
+        self._data: OrderedDict[Hashable, _Entry[V]] = OrderedDict()
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.expires > time.monotonic()
+
+    def get(self, key: Hashable) -> V | None:
+        found = self.get_stale(key, count_stale=False)
+        return found[0] if found is not None and found[1] else None
+
+    def get_stale(self, key: Hashable, count_stale: bool = True) -> tuple[V, bool] | None:
+        """Return ``(value, fresh)``, including entries past ``ttl`` but still within ``stale_ttl``."""
+        entry = self._data.get(key)
+        now = time.monotonic()
+        if entry is not None and entry.expires + self.stale_ttl <= now:
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+        fresh = entry is not None and entry.expires > now
+        if entry is None or not (fresh or count_stale):
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry.value, fresh
+
+    def set(self, key: Hashable, value: V) -> None:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.sweep(now)
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.pop(key)
+            return
+        self.pop(key)
+        self._data[key] = _Entry(value, now + self.ttl, size)
+        self.total_bytes += size
+        while len(self._data) > self.max_entries or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    def sweep(self, now: float | None = None) -> None:
+        now = time.monotonic() if now is None else now
+        expired = [key for key, entry in self._data.items() if entry.expires + self.stale_ttl <= now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        self._next_sweep = now + self.sweep_interval
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.total_bytes = 0
+        self.hits = self.misses = self.stale_hits = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        self.total_bytes -= self._data.pop(key).size
+
+
+class SingleFlight[V]:
+    """Collapses concurrent calls for the same key onto one in-flight task.
+
+    ``do`` waits for the shared result; ``start`` kicks off the call in the background (for
+    stale-while-revalidate) if it isn't already running, and only logs a failure.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Task[V]] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> V:
+        # Shielded so one caller giving up (client disconnect) doesn't cancel it for everyone else.
+        return await asyncio.shield(self._task(key, fn))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> None:
+        self._task(key, fn).add_done_callback(_log_background_failure)
+
+    def _task(self, key: Hashable, fn: Callable[[], Awaitable[V]]) -> asyncio.Task[V]:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+
+class LoadedSet:
+    """A set of strings loaded from the database on first use and kept until cleared.
+
+    For small sets the admin router clears whenever it writes their source rows. A load that was
+    under way when the set was cleared is returned to its caller but not kept.
+    """
+
+    def __init__(self) -> None:
+        self._values: frozenset[str] | None = None
+        self._generation = 0
+
+    async def contains(self, value: str, load: Callable[[], Awaitable[Iterable[str]]]) -> bool:
+        values = self._values
+        if values is None:
+            generation = self._generation
+            values = frozenset(await load())
+            if generation == self._generation:
+                self._values = values
+        return value in values
+
+    def clear(self) -> None:
+        self._values = None
+        self._generation += 1
+
+
+class LoadedValues[V]:
+    """A TTLCache filled by loading each key from the database on first use.
+
+    Like LoadedSet, the admin router clears it whenever it writes the source rows, and a load that
+    was under way when it was cleared is returned to its caller but not kept.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self._values = TTLCache[V](max_entries, ttl)
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = await load()
+        if generation == self._generation:
+            self._values.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._generation += 1
+
+
+# RAWG ids of the games attached to posts (post media are written with their post).
+game_ids = LoadedSet()
+# Published-post totals keyed by tag id, with None standing for the unfiltered listing.
+post_counts = LoadedValues[int](settings.POST_COUNT_CACHE_MAX_ENTRIES, settings.POST_COUNT_CACHE_TTL_SECONDS)
+
+
+def _log_background_failure(task: asyncio.Task[Any]) -> None:
+    if not task.cancelled() and (exc := task.exception()) is not None:
+        logger.warning("Background refresh failed: %r", exc)
+
+
+# Headers of the cached response that a 304 served from the cache repeats.
+_VALIDATOR_HEADERS = (b"etag", b"last-modified", b"cache-control")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+    def header(self, name: bytes) -> str | None:
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+
+    def is_fresh_for(self, scope: Scope) -> bool:
+        """Whether the client's conditional headers say it already holds this exact response."""
+        etag, last_modified = self.header(b"etag"), self.header(b"last-modified")
+        if etag is None or last_modified is None:
+            return False
+        return is_not_modified(Request(scope), etag, parsedate_to_datetime(last_modified))
+
+
+# Public GET routes served from the response cache, by path prefix, and the namespace an admin
+# write invalidates to drop them.
+CACHED_ROUTES: dict[str, str] = {
+    "/api/posts": "posts",
+    "/api/tags": "posts",
+    "/api/pages": "pages",
+    "/api/nav-links": "nav",
+    "/api/social-links": "social",
+    "/api/profile": "profile",
+    "/api/travels": "travels",
+    "/api/bootstrap": "bootstrap",
+}
+
+# Namespaces whose data is also part of the /api/bootstrap bundle.
+BOOTSTRAP_SOURCES = frozenset({"posts", "nav", "social", "profile"})
+
+
+def namespace_for(path: str) -> str | None:
+    for prefix, namespace in CACHED_ROUTES.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            return namespace
+    return None
+
+
+class ResponseCache:
+    """Serialized public responses keyed by path and query string, grouped by namespace."""
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int | None = None) -> None:
+        self._entries: TTLCache[CachedResponse] = TTLCache(
+            max_entries, ttl, max_bytes=max_bytes, sizeof=lambda response: len(response.body)
+        )
+        # Bumped on every invalidation so a response computed before an admin write is not
+        # stored after it.
+        self._generations: dict[str, int] = {}
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: str) -> CachedResponse | None:
+        return self._entries.get((namespace, self.generation(namespace), key))
+
+    def set(self, namespace: str, generation: int, key: str, response: CachedResponse) -> None:
+        if generation == self.generation(namespace):
+            self._entries.set((namespace, generation, key), response)
+
+    def invalidate(self, *namespaces: str) -> None:
+        # Old entries become unreachable once the generation moves on and age out of the LRU.
+        for namespace in namespaces:
+            self._generations[namespace] = self.generation(namespace) + 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
+
+
+response_cache = ResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+)
+
+
+def invalidate(*namespaces: str) -> None:
+    """Drop everything cached from the given namespaces ("posts", "pages", "nav", ...)."""
+    note_write()
+    if "posts" in namespaces:
+        post_counts.clear()
+        game_ids.clear()
+    if BOOTSTRAP_SOURCES.intersection(namespaces):
+        namespaces = (*namespaces, "bootstrap")
+    response_cache.invalidate(*namespaces)
+
+
+def invalidate_all() -> None:
+    post_counts.clear()
+    game_ids.clear()
+    response_cache.clear()
+
+
+class ResponseCacheMiddleware:
+    """Serves repeat GETs on CACHED_ROUTES from memory without touching the database."""
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache = response_cache) -> None:
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        namespace = namespace_for(scope["path"])
+        if namespace is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"{scope['path']}?{scope['query_string'].decode('latin-1')}"
+        cached = self.cache.get(namespace, key)
+        if cached is not None and cached.is_fresh_for(scope):
+            validators = [(k, v) for k, v in cached.headers if k.lower() in _VALIDATOR_HEADERS]
+            await send({"type": "http.response.start", "status": 304, "headers": [*validators, (b"x-cache", b"HIT")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        if cached is not None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": cached.status,
+                    "headers": [*cached.headers, (b"x-cache", b"HIT")],
+                }
+            )
+            await send({"type": "http.response.body", "body": cached.body})
+            return
+
+        generation = self.cache.generation(namespace)
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                message = {**message, "headers": [*message.get("headers", []), (b"x-cache", b"MISS")]}
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and start is not None and start["status"] == 200:
+                    response = CachedResponse(200, list(start.get("headers", [])), b"".join(chunks))
+                    self.cache.set(namespace, generation, key, response)
+            await send(message)
+
+        await self.app(scope, receive, send_and_capture)
@@ -0,0 +1,44 @@
+"""Conditional GET helpers: validators for cacheable resources and the 304 check."""
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def validator_headers(etag: str, last_modified: datetime) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_as_utc(last_modified), usegmt=True),
+        # Let browsers and proxies keep a copy but revalidate it every time.
+        "Cache-Control": "no-cache",
+    }
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 §13.1.3).
+        return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except TypeError, ValueError:
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates have one-second resolution.
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC.
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
@@ -3,12 +3,50 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Connection pool and asyncpg settings (Postgres only). Set DB_STATEMENT_CACHE_SIZE=0 behind a
+    # transaction-mode pooler such as PgBouncer or Neon's pooled endpoint: it turns off both asyncpg's
+    # and SQLAlchemy's prepared statement caches and gives each prepared statement a unique name.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT_SECONDS: float = 30.0
+    # Optional read replica for the public GET endpoints; reads fall back to the primary while it is
+    # unreachable and for a moment after each admin write.
+    DATABASE_READ_URL: str = ""
+    DATABASE_READ_RETRY_SECONDS: int = 30
+    DATABASE_READ_AFTER_WRITE_SECONDS: float = 5.0
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_ENTRIES: int = 256
+    # bcrypt runs off the event loop on this many threads; extra logins queue behind them
+    BCRYPT_MAX_WORKERS: int = 2
     UPLOAD_DIR: str = "uploads"
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    # WebP copies of the profile photo; the sidebar shows it 208 CSS px wide
+    PROFILE_PHOTO_WIDTHS: list[int] = [240, 480, 720]
     RAWG_API_KEY: str = ""
     ENVIRONMENT: str = "production"
+    # Render the heavier public responses with pydantic-core directly instead of response_model
+    FAST_JSON_RESPONSES: bool = True
+    # Load post tags and media as JSON arrays inside the posts query instead of two selectin queries
+    AGGREGATE_POST_RELATIONS: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    POST_COUNT_CACHE_MAX_ENTRIES: int = 256
+    POST_COUNT_CACHE_TTL_SECONDS: int = 300
+    RAWG_CACHE_MAX_ENTRIES: int = 500
+    RAWG_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    HTTP2_ENABLED: bool = False  # requires the h2 package (httpx[http2])
+    LETTERBOXD_REFRESH_SECONDS: int = 3600
 
     class Config:
         env_file = ".env"
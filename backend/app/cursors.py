@@ -0,0 +1,22 @@
+"""Opaque cursors for keyset pagination: the sort key of a row as URL-safe base64 JSON."""
+
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def encode_cursor(*key: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> tuple[Any, ...]:
+    """The key encoded in cursor, each part passed through the matching parser; 400 if it doesn't fit."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return tuple(parse(part) for parse, part in zip(parsers, key, strict=True))
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
@@ -1,13 +1,78 @@
-from collections.abc import AsyncGenerator
+import logging
+import math
+import time
+from collections.abc import AsyncGenerator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Any
+from uuid import uuid4
 
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, connect_args={"ssl": True})
+logger = logging.getLogger(__name__)
+
+
+def engine_options(url: str) -> dict[str, Any]:
+    """Keyword arguments for create_async_engine: pool and asyncpg tuning from Settings for Postgres."""
+    options: dict[str, Any] = {"connect_args": {"ssl": True}}
+    if make_url(url).get_backend_name() != "postgresql":
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    options["connect_args"].update(
+        # asyncpg's own cache and the one SQLAlchemy's asyncpg adapter keeps on top of it.
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        prepared_statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS,
+    )
+    if settings.DB_STATEMENT_CACHE_SIZE == 0:
+        # Behind a transaction-mode pooler the next statement may run on a server connection that
+        # already has one of asyncpg's sequential names prepared; unique names can't collide.
+        options["connect_args"]["prepared_statement_name_func"] = _unique_statement_name
+    return options
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+_engine_options = engine_options(settings.DATABASE_URL)
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+read_engine = (
+    create_async_engine(settings.DATABASE_READ_URL, **engine_options(settings.DATABASE_READ_URL))
+    if settings.DATABASE_READ_URL
+    else None
+)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False) if read_engine is not None else None
+
+# While the replica is unreachable, reads go to the primary until this monotonic time.
+_replica_retry_at = 0.0
+# Monotonic time of the last write; reads stay on the primary shortly after it so a lagging
+# replica can't hand back (and the response cache keep) data from before the write.
+_last_write = -math.inf
+
+
+def pool_config() -> str:
+    """One-line summary of the engine's effective pool settings, for the startup log."""
+    tuned = {key: value for key, value in _engine_options.items() if key != "connect_args"}
+    tuned |= {
+        key: value
+        for key, value in _engine_options["connect_args"].items()
+        if key not in ("ssl", "prepared_statement_name_func")
+    }
+    return " ".join([type(engine.pool).__name__, *(f"{key}={value}" for key, value in tuned.items())])
+
 
 class Base(DeclarativeBase):
     pass
@@ -16,3 +81,38 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncGenerator[AsyncSession]:
     async with SessionLocal() as session:
         yield session
+
+
+def note_write() -> None:
+    global _last_write
+    _last_write = time.monotonic()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession]:
+    """Session for public read-only endpoints: the replica when configured and reachable, else the primary."""
+    global _replica_retry_at
+    now = time.monotonic()
+    if (
+        ReadSessionLocal is not None
+        and now >= _replica_retry_at
+        and now - _last_write >= settings.DATABASE_READ_AFTER_WRITE_SECONDS
+    ):
+        async with ReadSessionLocal() as session:
+            try:
+                await session.connection()
+            except (OSError, TimeoutError, DBAPIError) as exc:
+                _replica_retry_at = time.monotonic() + settings.DATABASE_READ_RETRY_SECONDS
+                logger.warning("Read replica unavailable, using the primary: %r", exc)
+            else:
+                yield session
+                return
+    async with SessionLocal() as session:
+        yield session
+
+
+read_session = asynccontextmanager(get_read_db)
+
+
+def get_read_sessions() -> Callable[[], AbstractAsyncContextManager[AsyncSession]]:
+    """Session factory for endpoints that run several read queries concurrently, one session each."""
+    return read_session
@@ -1,21 +1,27 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import ResponseCacheMiddleware
 from app.config import settings
-from app.database import get_db
+from app.database import get_db, pool_config
+from app.http_client import close_http_client, get_http_client
 from app.limiter import limiter
 from app.routers import (
     admin,
     auth,
+    bootstrap,
     letterboxd,
     nav,
     pages,
@@ -25,12 +31,29 @@ from app.routers import (
     social,
     travels,
 )
+from app.uploads import UploadFiles
 
-app = FastAPI(title="whoisrgj Blog API", version="1.0.0")
+# uvicorn only configures its own loggers, so startup info goes alongside its startup messages.
+logger = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    logger.info("Database pool: %s", pool_config())
+    feed_refresher = asyncio.create_task(letterboxd.run_feed_refresher(get_http_client()))
+    yield
+    feed_refresher.cancel()
+    with suppress(asyncio.CancelledError):
+        await feed_refresher
+    await close_http_client()
+
+
+app = FastAPI(title="whoisrgj Blog API", version="1.0.0", lifespan=lifespan)
 
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # type: ignore[arg-type]
 
+app.add_middleware(ResponseCacheMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost", "http://localhost:5173", "https://blog.whoisrgj.com"],
@@ -41,8 +64,9 @@ app.add_middleware(
 app.add_middleware(SlowAPIMiddleware)
 
 Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
-app.mount("/api/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+app.mount("/api/uploads", UploadFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
+app.include_router(bootstrap.router, prefix="/api")
 app.include_router(posts.router, prefix="/api")
 app.include_router(pages.router, prefix="/api")
 app.include_router(nav.router, prefix="/api")
@@ -13,6 +13,8 @@ class Page(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(280), unique=True, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Sanitized HTML rendered from content on write; null until rendered (scripts/render_content.py).
+    content_html: Mapped[str | None] = mapped_column(Text, nullable=True)
     published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
     updated_at: Mapped[datetime] = mapped_column(
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, String, Table, Text
+from sqlalchemy import DDL, Boolean, Column, DateTime, ForeignKey, Index, String, Table, Text, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -27,6 +27,8 @@ class Post(Base):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(280), unique=True, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+    # Sanitized HTML rendered from content on write; null until rendered (scripts/render_content.py).
+    content_html: Mapped[str | None] = mapped_column(Text, nullable=True)
     excerpt: Mapped[str | None] = mapped_column(Text, nullable=True)
     published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
@@ -43,3 +45,31 @@ class Post(Base):
         cascade="all, delete-orphan",
         lazy="selectin",
     )
+
+
+# Serves the public archive listing, including keyset pagination on (created_at, id).
+Index("ix_posts_published_created_at_id", Post.published, Post.created_at.desc(), Post.id.desc())
+# The primary key leads with post_id; tag-filtered listings and counts go from tag to posts.
+Index("ix_post_tags_tag_id_post_id", post_tags.c.tag_id, post_tags.c.post_id)
+
+# Full-text search. On Postgres, migration 0012 adds a generated ``search_vector`` tsvector column with
+# a GIN index; it is left off the model because SQLite can't create it. SQLite (the test database)
+# gets an FTS5 index over the same fields instead, kept in sync by triggers.
+for _statement in (
+    "CREATE VIRTUAL TABLE posts_fts USING fts5("
+    "title, excerpt, content, content='posts', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, excerpt, content) VALUES (new.id, new.title, new.excerpt, new.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, content) "
+    "VALUES ('delete', old.id, old.title, old.excerpt, old.content); "
+    "END",
+    "CREATE TRIGGER posts_fts_update AFTER UPDATE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, content) "
+    "VALUES ('delete', old.id, old.title, old.excerpt, old.content); "
+    "INSERT INTO posts_fts(rowid, title, excerpt, content) VALUES (new.id, new.title, new.excerpt, new.content); "
+    "END",
+):
+    event.listen(Post.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Post.__table__, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"))
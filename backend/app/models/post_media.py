@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -22,3 +22,7 @@ class PostMedia(Base):
     background_image_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
 
     post: Mapped[Post] = relationship("Post", back_populates="media")
+
+
+# Looking media up by external id, e.g. loading the RAWG ids featured in posts.
+Index("ix_post_media_media_type_external_id", PostMedia.media_type, PostMedia.external_id)
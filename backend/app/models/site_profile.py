@@ -8,4 +8,6 @@ class SiteProfile(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     photo_url: Mapped[str | None]
+    # "<url> <width>w, ..." for the WebP copies of an uploaded photo; null for external URLs.
+    photo_srcset: Mapped[str | None]
     bio: Mapped[str | None]
@@ -18,4 +18,8 @@ class Tag(Base):
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
 
-    posts: Mapped[list[Post]] = relationship("Post", secondary="post_tags", back_populates="tags", lazy="selectin")
+    # Never loaded implicitly: a tag can have any number of posts. Query posts by tag instead, and let
+    # the post_tags foreign keys' ON DELETE CASCADE drop the links when a tag is deleted.
+    posts: Mapped[list[Post]] = relationship(
+        "Post", secondary="post_tags", back_populates="tags", lazy="raise", passive_deletes=True
+    )
@@ -0,0 +1,101 @@
+"""Loading posts together with their tags and media in a single statement.
+
+The ORM path loads ``Post.tags`` and ``Post.media`` with two extra selectin queries per result set.
+Here the main query selects the post columns the response needs plus one correlated subquery per
+relationship that aggregates it into a JSON array (``json_agg`` on Postgres, ``json_group_array``
+on SQLite), and the rows are validated straight into the response schema. AGGREGATE_POST_RELATIONS
+switches back to the ORM path.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Select, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import QueryableAttribute, defer
+from sqlalchemy.sql.expression import ColumnElement
+
+from app.config import settings
+from app.models.post import Post, post_tags
+from app.models.post_media import PostMedia
+from app.models.tag import Tag
+
+_SUMMARY_COLUMNS = (Post.id, Post.title, Post.slug, Post.excerpt, Post.published, Post.created_at, Post.updated_at)
+
+
+async def fetch_posts[S: BaseModel](
+    db: AsyncSession, stmt: Select[tuple[Post]], schema: type[S], *columns: QueryableAttribute[Any]
+) -> list[S]:
+    """Run stmt, a select of Post, and validate each post into schema.
+
+    columns are the Post columns schema needs beyond PostSummary's (e.g. Post.content); the
+    remaining body columns are never loaded.
+    """
+    if not settings.AGGREGATE_POST_RELATIONS:
+        unused = {Post.content, Post.content_html} - set(columns)
+        stmt = stmt.options(*(defer(column) for column in unused))
+        return [schema.model_validate(post) for post in (await db.execute(stmt)).scalars()]
+
+    rows = await db.execute(with_relations(stmt, db.get_bind().dialect.name, *columns))
+    return [schema.model_validate(row._mapping) for row in rows]
+
+
+def with_relations(stmt: Select[tuple[Post]], dialect: str, *columns: QueryableAttribute[Any]) -> Select[Any]:
+    """stmt narrowed to PostSummary's columns plus columns, with "tags" and "media" as JSON arrays."""
+    return stmt.with_only_columns(
+        *_SUMMARY_COLUMNS,
+        *columns,
+        _tags_json(dialect).label("tags"),
+        _media_json(dialect).label("media"),
+    )
+
+
+def _json_array(dialect: str, obj: ColumnElement[Any], order_by: QueryableAttribute[Any]) -> ColumnElement[Any]:
+    empty: ColumnElement[Any]
+    if dialect == "postgresql":
+        agg = func.json_agg(aggregate_order_by(obj, order_by))
+        empty = literal_column("'[]'::json")
+    else:
+        agg = func.json_group_array(obj)
+        empty = literal_column("'[]'")
+    # Aggregating no rows gives NULL on Postgres.
+    return func.coalesce(agg, empty, type_=JSON)
+
+
+def _json_object(dialect: str, *columns: QueryableAttribute[Any]) -> ColumnElement[Any]:
+    build = func.json_build_object if dialect == "postgresql" else func.json_object
+    # Keys are inlined: asyncpg can't infer a type for bound parameters of json_build_object.
+    args: list[Any] = []
+    for column in columns:
+        args += [literal_column(f"'{column.key}'"), column]
+    return build(*args)
+
+
+def _tags_json(dialect: str) -> ColumnElement[Any]:
+    obj = _json_object(dialect, Tag.id, Tag.name, Tag.slug)
+    return (
+        select(_json_array(dialect, obj, Tag.id))
+        .select_from(post_tags.join(Tag, Tag.id == post_tags.c.tag_id))
+        .where(post_tags.c.post_id == Post.id)
+        # Only ever correlate on posts: a listing filtered by tag joins post_tags and tags itself.
+        .correlate(Post)
+        .scalar_subquery()
+    )
+
+
+def _media_json(dialect: str) -> ColumnElement[Any]:
+    obj = _json_object(
+        dialect,
+        PostMedia.id,
+        PostMedia.media_type,
+        PostMedia.external_id,
+        PostMedia.title,
+        PostMedia.background_image_url,
+    )
+    return (
+        select(_json_array(dialect, obj, PostMedia.id))
+        .where(PostMedia.post_id == Post.id)
+        .correlate(Post)
+        .scalar_subquery()
+    )
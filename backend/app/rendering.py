@@ -0,0 +1,78 @@
+"""Markdown to sanitized HTML, rendered once when content is written.
+
+Mirrors what the frontend's MarkdownRenderer did in the browser: GitHub-flavoured Markdown (tables,
+strikethrough, autolinks, task lists), raw HTML shown as text, fenced code left as
+``<code class="language-…">`` for highlight.js, and ```terminal fences laid out like TerminalBlock.
+"""
+
+import asyncio
+import html
+import re
+from typing import Any
+
+import nh3
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+from mdit_py_plugins.tasklists import tasklists_plugin
+
+_md = MarkdownIt("gfm-like", {"html": False}).use(tasklists_plugin)
+_default_fence = _md.renderer.rules["fence"]
+
+_ALLOWED_TAGS = nh3.ALLOWED_TAGS | {"input"}
+_ALLOWED_ATTRIBUTES = {
+    **nh3.ALLOWED_ATTRIBUTES,
+    "code": {"class"},
+    "div": {"class"},
+    "span": {"class"},
+    "ul": {"class"},
+    "li": {"class"},
+    "input": {"class", "type", "checked", "disabled"},
+    "th": nh3.ALLOWED_ATTRIBUTES["th"] | {"style"},
+    "td": nh3.ALLOWED_ATTRIBUTES["td"] | {"style"},
+}
+_PROMPT_RE = re.compile(r"^#prompt (.+)")
+
+
+def render_markdown(text: str) -> str:
+    return nh3.clean(
+        _md.render(text),
+        tags=_ALLOWED_TAGS,
+        attributes=_ALLOWED_ATTRIBUTES,
+        filter_style_properties={"text-align"},
+    )
+
+
+async def render_markdown_async(text: str) -> str:
+    # markdown-it is pure Python (roughly 3 ms per KB of Markdown), so long documents render on a
+    # worker thread rather than stalling the event loop.
+    return await asyncio.to_thread(render_markdown, text)
+
+
+def _render_fence(self: Any, tokens: list[Token], idx: int, options: Any, env: Any) -> str:
+    token = tokens[idx]
+    if token.info.strip() == "terminal":
+        return _render_terminal(token.content)
+    return str(_default_fence(tokens, idx, options, env))
+
+
+def _render_terminal(content: str) -> str:
+    lines = content.removesuffix("\n").split("\n")
+    prompt = "$"
+    if match := _PROMPT_RE.match(lines[0]):
+        prompt, lines = match.group(1), lines[1:]
+
+    rows = []
+    for line in lines:
+        if line.startswith("$ "):
+            rows.append(
+                f'<div><span class="text-green-400 select-none">{html.escape(prompt)} </span>'
+                f'<span class="text-stone-900 dark:text-white">{html.escape(line[2:])}</span></div>'
+            )
+        elif line == "":
+            rows.append('<div class="h-3"></div>')
+        else:
+            rows.append(f'<div class="text-gray-400">{html.escape(line)}</div>')
+    return f'<pre><div class="rounded-md font-mono text-base overflow-x-auto">{"".join(rows)}</div></pre>\n'
+
+
+_md.add_render_rule("fence", _render_fence)
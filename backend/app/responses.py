@@ -0,0 +1,43 @@
+"""JSON responses rendered straight from the response schema.
+
+Returning ORM objects with ``response_model`` costs FastAPI a validation, a dump to Python
+objects and a ``json.dumps`` per request. ``ModelResponse`` validates once, from attributes, and
+lets pydantic-core write the JSON bytes directly.
+"""
+
+from functools import cache
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.config import settings
+
+
+@cache
+def _adapter(schema: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(schema)
+
+
+class ModelResponse(Response):
+    media_type = "application/json"
+
+    def __init__(
+        self, schema: Any, content: Any, status_code: int = 200, headers: dict[str, str] | None = None
+    ) -> None:
+        self.adapter = _adapter(schema)
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
+
+
+def model_response(schema: Any, content: Any, headers: dict[str, str] | None = None) -> Any:
+    """``content`` as a ModelResponse, or unchanged for the route's response_model when FAST_JSON_RESPONSES is off.
+
+    Routes using this should still declare ``response_model=schema`` for the OpenAPI docs, and set
+    any ``headers`` on their injected Response too, since only one of the two paths is taken.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return content
+    return ModelResponse(schema, content, headers=headers)
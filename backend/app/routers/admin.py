@@ -1,16 +1,21 @@
+import asyncio
+import os
+from datetime import UTC, datetime
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from slugify import slugify
-from sqlalchemy import func, select, update
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import get_current_user, get_password_hash, verify_password
+from app.auth import forget_all_sessions, get_current_user, get_password_hash_async, verify_password_async
+from app.cache import invalidate, response_cache
 from app.config import settings
 from app.database import get_db
 from app.models.nav_link import NavLink
 from app.models.page import Page
-from app.models.post import Post
+from app.models.post import Post, post_tags
 from app.models.post_media import PostMedia
 from app.models.site_profile import SiteProfile
 from app.models.social_link import SocialLink
@@ -18,6 +23,8 @@ from app.models.tag import Tag
 from app.models.user import User
 from app.models.visited_country import VisitedCountry
 from app.models.wanted_country import WantedCountry
+from app.post_queries import fetch_posts
+from app.rendering import render_markdown_async
 from app.schemas.auth import PasswordChangeRequest
 from app.schemas.nav_link import NavLinkAdd, NavLinkOut, NavLinkReorder
 from app.schemas.page import PageCreate, PageOut, PageSummary, PageUpdate
@@ -28,9 +35,22 @@ from app.schemas.social_link import SocialLinkCreate, SocialLinkOut, SocialLinkR
 from app.schemas.tag import TagCreate, TagOut
 from app.schemas.visited_country import VisitedCountryCreate, VisitedCountryOut
 from app.schemas.wanted_country import WantedCountryCreate, WantedCountryOut
+from app.uploads import (
+    InvalidImage,
+    UploadTooLarge,
+    make_webp_derivatives,
+    remove_unreferenced,
+    staging_file,
+    store_upload,
+    uploaded_stem,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+SLUG_ATTEMPTS = 3
+# Post slugs that fixed routes under /api/posts/ (e.g. /api/posts/search) would shadow.
+RESERVED_POST_SLUGS = frozenset({"search"})
+
 
 def require_auth(current_user: User = Depends(get_current_user)) -> User:
     return current_user
@@ -44,7 +64,7 @@ async def admin_list_posts(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(require_auth),
 ) -> list[PostSummary]:
-    return (await db.execute(select(Post).order_by(Post.created_at.desc()))).scalars().all()  # type: ignore[return-value]
+    return await fetch_posts(db, select(Post).order_by(Post.created_at.desc()), PostSummary)
 
 
 @router.get("/posts/{post_id}", response_model=PostOut)
@@ -53,10 +73,10 @@ async def admin_get_post(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(require_auth),
 ) -> PostOut:
-    post = (await db.execute(select(Post).where(Post.id == post_id))).scalar_one_or_none()
-    if not post:
+    posts = await fetch_posts(db, select(Post).where(Post.id == post_id), PostOut, Post.content)
+    if not posts:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post  # type: ignore[return-value]
+    return posts[0]
 
 
 @router.post("/posts", response_model=PostOut, status_code=201)
@@ -65,19 +85,30 @@ async def admin_create_post(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(require_auth),
 ) -> PostOut:
-    slug = await _unique_slug(db, payload.title)
-    tags = await _resolve_tags(db, payload.tag_ids)
-    post = Post(
-        title=payload.title,
-        slug=slug,
-        content=payload.content,
-        excerpt=payload.excerpt,
-        published=payload.published,
-        tags=tags,
-        media=_build_media(payload.media),
-    )
-    db.add(post)
-    await db.commit()
+    content_html = await render_markdown_async(payload.content)
+    for attempt in range(SLUG_ATTEMPTS):
+        post = Post(
+            title=payload.title,
+            slug=await _unique_slug(db, payload.title),
+            content=payload.content,
+            content_html=content_html,
+            excerpt=payload.excerpt,
+            published=payload.published,
+            tags=await _resolve_tags(db, payload.tag_ids),
+            media=_build_media(payload.media),
+        )
+        db.add(post)
+        try:
+            await db.commit()
+            break
+        except IntegrityError as exc:
+            # Another post took the same slug between our check and the insert: pick again.
+            await db.rollback()
+            if "slug" not in str(exc.orig):
+                raise
+            if attempt == SLUG_ATTEMPTS - 1:
+                raise HTTPException(status_code=409, detail="Could not allocate a unique slug") from exc
+    invalidate("posts")
     await db.refresh(post)
     return post  # type: ignore[return-value]
 
@@ -97,16 +128,21 @@ async def admin_update_post(
         post.title = payload.title
     if payload.content is not None:
         post.content = payload.content
+        post.content_html = await render_markdown_async(payload.content)
     if payload.excerpt is not None:
         post.excerpt = payload.excerpt
     if payload.published is not None:
         post.published = payload.published
+    # Relationship changes don't touch the posts row, so bump updated_at (the ETag input) by hand.
     if payload.tag_ids is not None:
         post.tags = await _resolve_tags(db, payload.tag_ids)
+        post.updated_at = datetime.now(UTC)
     if payload.media is not None:
         post.media = _build_media(payload.media)
+        post.updated_at = datetime.now(UTC)
 
     await db.commit()
+    invalidate("posts")
     await db.refresh(post)
     return post  # type: ignore[return-value]
 
@@ -122,6 +158,7 @@ async def admin_delete_post(
         raise HTTPException(status_code=404, detail="Post not found")
     await db.delete(post)
     await db.commit()
+    invalidate("posts")
 
 
 # --- Tags ---
@@ -140,6 +177,7 @@ async def admin_create_tag(
     tag = Tag(name=payload.name, slug=slug)
     db.add(tag)
     await db.commit()
+    invalidate("posts")
     await db.refresh(tag)
     return tag  # type: ignore[return-value]
 
@@ -153,8 +191,11 @@ async def admin_delete_tag(
     tag = (await db.execute(select(Tag).where(Tag.id == tag_id))).scalar_one_or_none()
     if not tag:
         raise HTTPException(status_code=404, detail="Tag not found")
+    tagged = select(post_tags.c.post_id).where(post_tags.c.tag_id == tag_id)
+    await db.execute(update(Post).where(Post.id.in_(tagged)).values(updated_at=datetime.now(UTC)))
     await db.delete(tag)
     await db.commit()
+    invalidate("posts")
 
 
 # --- Pages ---
@@ -193,10 +234,12 @@ async def admin_create_page(
         title=payload.title,
         slug=payload.slug,
         content=payload.content,
+        content_html=await render_markdown_async(payload.content),
         published=payload.published,
     )
     db.add(page)
     await db.commit()
+    invalidate("pages", "nav")
     await db.refresh(page)
     return page  # type: ignore[return-value]
 
@@ -221,10 +264,12 @@ async def admin_update_page(
         page.title = payload.title
     if payload.content is not None:
         page.content = payload.content
+        page.content_html = await render_markdown_async(payload.content)
     if payload.published is not None:
         page.published = payload.published
 
     await db.commit()
+    invalidate("pages", "nav")
     await db.refresh(page)
     return page  # type: ignore[return-value]
 
@@ -240,6 +285,7 @@ async def admin_delete_page(
         raise HTTPException(status_code=404, detail="Page not found")
     await db.delete(page)
     await db.commit()
+    invalidate("pages", "nav")
 
 
 # --- Nav Links ---
@@ -277,6 +323,7 @@ async def admin_add_nav_link(
         )
     db.add(nav_link)
     await db.commit()
+    invalidate("nav")
     await db.refresh(nav_link)
     return nav_link  # type: ignore[return-value]
 
@@ -292,6 +339,7 @@ async def admin_delete_nav_link(
         raise HTTPException(status_code=404, detail="Nav link not found")
     await db.delete(nav_link)
     await db.commit()
+    invalidate("nav")
 
 
 @router.put("/nav-links/reorder", response_model=list[NavLinkOut])
@@ -311,6 +359,7 @@ async def admin_reorder_nav_links(
     for position, nav_link_id in enumerate(payload.ordered_ids, start=1):
         id_to_link[nav_link_id].position = position
     await db.commit()
+    invalidate("nav")
     return (await db.execute(select(NavLink).order_by(NavLink.position.asc()))).scalars().all()  # type: ignore[return-value]
 
 
@@ -335,6 +384,7 @@ async def admin_add_social_link(
     social_link = SocialLink(platform=payload.platform, url=payload.url, position=(count or 0) + 1)
     db.add(social_link)
     await db.commit()
+    invalidate("social")
     await db.refresh(social_link)
     return social_link  # type: ignore[return-value]
 
@@ -350,6 +400,7 @@ async def admin_delete_social_link(
         raise HTTPException(status_code=404, detail="Social link not found")
     await db.delete(social_link)
     await db.commit()
+    invalidate("social")
 
 
 @router.put("/social-links/reorder", response_model=list[SocialLinkOut])
@@ -369,6 +420,7 @@ async def admin_reorder_social_links(
     for position, social_link_id in enumerate(payload.ordered_ids, start=1):
         id_to_link[social_link_id].position = position
     await db.commit()
+    invalidate("social")
     return (await db.execute(select(SocialLink).order_by(SocialLink.position.asc()))).scalars().all()  # type: ignore[return-value]
 
 
@@ -401,6 +453,7 @@ async def admin_add_visited_country(
     country = VisitedCountry(name=payload.name, iso_numeric=payload.iso_numeric)
     db.add(country)
     await db.commit()
+    invalidate("travels")
     await db.refresh(country)
     return country  # type: ignore[return-value]
 
@@ -416,6 +469,7 @@ async def admin_delete_visited_country(
         raise HTTPException(status_code=404, detail="Country not found")
     await db.delete(country)
     await db.commit()
+    invalidate("travels")
 
 
 # --- Travels Wishlist ---
@@ -447,6 +501,7 @@ async def admin_add_wanted_country(
     country = WantedCountry(name=payload.name, iso_numeric=payload.iso_numeric)
     db.add(country)
     await db.commit()
+    invalidate("travels")
     await db.refresh(country)
     return country  # type: ignore[return-value]
 
@@ -462,6 +517,7 @@ async def admin_delete_wanted_country(
         raise HTTPException(status_code=404, detail="Country not found")
     await db.delete(country)
     await db.commit()
+    invalidate("travels")
 
 
 # --- Profile ---
@@ -484,9 +540,19 @@ async def admin_update_profile(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(require_auth),
 ) -> SiteProfileOut:
-    profile = SiteProfile(id=1, photo_url=payload.photo_url, bio=payload.bio)
+    current = (await db.execute(select(SiteProfile).where(SiteProfile.id == 1))).scalar_one_or_none()
+    photo_changed = current is None or current.photo_url != payload.photo_url
+    # The srcset only describes the uploaded photo; drop it once the URL points anywhere else.
+    photo_srcset = None if photo_changed or current is None else current.photo_srcset
+    profile = SiteProfile(id=1, photo_url=payload.photo_url, photo_srcset=photo_srcset, bio=payload.bio)
     profile = await db.merge(profile)
     await db.commit()
+    invalidate("profile")
+    keep = uploaded_stem(profile.photo_url, "profile")
+    # An upload named before hashed names (e.g. /api/uploads/profile.jpg) has no stem to keep, but is still in use.
+    legacy_upload = keep is None and (profile.photo_url or "").startswith("/api/uploads/")
+    if photo_changed and not legacy_upload:
+        await asyncio.to_thread(remove_unreferenced, Path(settings.UPLOAD_DIR), "profile", keep)
     await db.refresh(profile)
     return profile  # type: ignore[return-value]
 
@@ -500,28 +566,53 @@ async def admin_upload_profile_photo(
     if file.content_type not in ("image/jpeg", "image/png", "image/gif", "image/webp"):
         raise HTTPException(status_code=400, detail="Only image files are allowed")
 
+    if file.size is not None and file.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
     ext = "jpg" if file.content_type == "image/jpeg" else file.content_type.split("/")[1]
 
     upload_dir = Path(settings.UPLOAD_DIR)
     upload_dir.mkdir(parents=True, exist_ok=True)
-    for old in upload_dir.glob("profile.*"):
-        old.unlink(missing_ok=True)
-
-    dest = upload_dir / f"profile.{ext}"
-    dest.write_bytes(await file.read())
-
-    photo_url = f"/api/uploads/profile.{ext}"
+    staged = await asyncio.to_thread(staging_file, upload_dir)
+    try:
+        digest = await asyncio.to_thread(store_upload, file.file, staged, settings.UPLOAD_MAX_BYTES)
+        stem = f"profile-{digest}"
+        derivatives = await asyncio.to_thread(make_webp_derivatives, staged, stem, settings.PROFILE_PHOTO_WIDTHS)
+        # The original is kept so the copies can be regenerated, but the site only links the WebP copies.
+        await asyncio.to_thread(os.replace, staged, upload_dir / f"{stem}.{ext}")
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File too large")
+    except InvalidImage:
+        raise HTTPException(status_code=400, detail="Could not read the image")
+    finally:
+        staged.unlink(missing_ok=True)  # already gone unless something above failed
+
+    urls = {width: f"/api/uploads/{path.name}" for width, path in derivatives.items()}
+    photo_url = urls[max(urls)]
+    photo_srcset = ", ".join(f"{url} {width}w" for width, url in urls.items())
     profile = (await db.execute(select(SiteProfile).where(SiteProfile.id == 1))).scalar_one_or_none()
     if profile is None:
-        profile = SiteProfile(id=1, photo_url=photo_url)
+        profile = SiteProfile(id=1, photo_url=photo_url, photo_srcset=photo_srcset)
         db.add(profile)
     else:
         profile.photo_url = photo_url
+        profile.photo_srcset = photo_srcset
     await db.commit()
+    invalidate("profile")
+    # Only once the new URLs are committed: until then the previous photo is still the one served.
+    await asyncio.to_thread(remove_unreferenced, upload_dir, "profile", stem)
     await db.refresh(profile)
     return profile  # type: ignore[return-value]
 
 
+# --- Cache ---
+
+
+@router.get("/cache")
+async def admin_cache_stats(_: User = Depends(require_auth)) -> dict[str, int]:
+    return response_cache.stats()
+
+
 # --- Account ---
 
 
@@ -531,13 +622,14 @@ async def admin_change_password(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_auth),
 ) -> dict[str, str]:
-    if not verify_password(req.current_password, current_user.hashed_password):
+    if not await verify_password_async(req.current_password, current_user.hashed_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     if len(req.new_password) < 8:
         raise HTTPException(status_code=400, detail="New password must be at least 8 characters")
-    hashed = get_password_hash(req.new_password)
+    hashed = await get_password_hash_async(req.new_password)
     await db.execute(update(User).where(User.id == current_user.id).values(hashed_password=hashed))
     await db.commit()
+    forget_all_sessions()
     return {"message": "Password updated successfully"}
 
 
@@ -545,13 +637,17 @@ async def admin_change_password(
 
 
 async def _unique_slug(db: AsyncSession, title: str) -> str:
+    """The title's slug, or the first free "<slug>-N" if it's taken. One query whatever the collisions."""
     base = slugify(title)
-    slug = base
+    stmt = select(Post.slug).where(or_(Post.slug == base, Post.slug.like(f"{base}-%")))
+    taken = set((await db.execute(stmt)).scalars())
+    if base not in taken and base not in RESERVED_POST_SLUGS:
+        return base
+    suffixes = {int(rest) for slug in taken if (rest := slug.removeprefix(f"{base}-")).isdigit()}
     counter = 1
-    while (await db.execute(select(Post).where(Post.slug == slug))).scalar_one_or_none():
-        slug = f"{base}-{counter}"
+    while counter in suffixes:
         counter += 1
-    return slug
+    return f"{base}-{counter}"
 
 
 async def _resolve_tags(db: AsyncSession, tag_ids: list[int]) -> list[Tag]:
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi import APIRouter, Cookie, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.auth import create_access_token, verify_password
+from app.auth import create_access_token, forget_session, verify_password_async
 from app.config import settings
 from app.database import get_db
 from app.limiter import limiter
@@ -37,7 +37,7 @@ async def login(
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, str]:
     user = (await db.execute(select(User).where(User.username == credentials.username))).scalar_one_or_none()
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -54,6 +54,7 @@ async def login(
 
 
 @router.post("/logout")
-async def logout(response: Response) -> dict[str, str]:
+async def logout(response: Response, access_token: str | None = Cookie(default=None)) -> dict[str, str]:
+    forget_session(access_token)
     _delete_auth_cookie(response, secure=settings.ENVIRONMENT != "development")
     return {"message": "Logged out"}
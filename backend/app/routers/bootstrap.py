@@ -0,0 +1,59 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_sessions
+from app.http_client import get_http_client
+from app.responses import model_response
+from app.routers import letterboxd, nav, posts, profile, social
+from app.schemas.bootstrap import Bootstrap
+
+router = APIRouter(tags=["public"])
+
+HOME_PAGE_SIZE = 10
+
+
+@router.get("/bootstrap", response_model=Bootstrap)
+async def get_bootstrap(
+    sessions: Callable[[], AbstractAsyncContextManager[AsyncSession]] = Depends(get_read_sessions),
+    client: httpx.AsyncClient = Depends(get_http_client),
+) -> Bootstrap:
+    """Everything the home page needs on first paint, in one response.
+
+    Each query gets its own session so they run concurrently; the serialized result is kept by the
+    response cache until an admin write to any of the sources (or a Letterboxd refresh) drops it.
+    """
+
+    async def query[T](fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        async with sessions() as db:
+            return await fn(db)
+
+    home_posts, tags, nav_links, social_links, site_profile, films = await asyncio.gather(
+        query(lambda db: posts.paginate_posts(db, size=HOME_PAGE_SIZE)),
+        query(posts.list_tags),
+        query(nav.list_nav_links),
+        query(social.list_social_links),
+        query(profile.get_profile),
+        _films(client),
+    )
+    bundle = {
+        "posts": home_posts,
+        "tags": tags,
+        "nav_links": nav_links,
+        "social_links": social_links,
+        "profile": site_profile,
+        "letterboxd": films,
+    }
+    return model_response(Bootstrap, bundle)
+
+
+async def _films(client: httpx.AsyncClient) -> list[dict]:
+    # The widget is optional; an unreachable feed shouldn't fail the whole page.
+    try:
+        return await letterboxd.recent_films(client)
+    except Exception:
+        return []
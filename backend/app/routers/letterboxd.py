@@ -1,69 +1,151 @@
+import asyncio
+import logging
+import random
 import re
 import time
 import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from typing import cast
 
 import httpx
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 
+from app.cache import SingleFlight, response_cache
+from app.config import settings
+from app.http_client import get_http_client
 from app.limiter import limiter
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 RSS_URL = "https://letterboxd.com/rawool7/rss/"
 LB_NS = "https://letterboxd.com"
+LETTERBOXD_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+RETRY_BASE_SECONDS = 30.0
+FEED_LIMIT = 5
 
 _cache: dict = {}
+_refreshes: SingleFlight[list[dict]] = SingleFlight()
+
+
+class _FeedParser:
+    """Incremental RSS parser that stops once ``limit`` rated films have been collected.
+
+    Items are parsed as soon as their closing tag arrives and then detached from the tree, so
+    memory stays flat no matter how long the feed is.
+    """
+
+    def __init__(self, limit: int = FEED_LIMIT) -> None:
+        self.limit = limit
+        self.films: list[dict] = []
+        self._parser: ET.XMLPullParser[ET.Element] = ET.XMLPullParser(events=("start", "end"))
+        self._channel: ET.Element | None = None
 
+    @property
+    def done(self) -> bool:
+        return len(self.films) >= self.limit
 
-def _parse_feed(xml_text: str) -> list[dict]:
-    root = ET.fromstring(xml_text)
-    channel = root.find("channel")
-    items = channel.findall("item") if channel is not None else []
-
-    results = []
-    for item in items:
-        rating_el = item.find(f"{{{LB_NS}}}memberRating")
-        if rating_el is None:
-            continue
-        title_el = item.find(f"{{{LB_NS}}}filmTitle")
-        year_el = item.find(f"{{{LB_NS}}}filmYear")
-        link_el = item.find("link")
-        desc_el = item.find("description")
-        poster_url = None
-        if desc_el is not None and desc_el.text:
-            m = re.search(r'<img src="([^"]+)"', desc_el.text)
-            if m:
-                poster_url = m.group(1)
-        results.append(
-            {
-                "title": title_el.text if title_el is not None else "",
-                "year": int(year_el.text) if year_el is not None and year_el.text is not None else None,
-                "rating": float(rating_el.text) if rating_el.text is not None else 0.0,
-                "url": link_el.text if link_el is not None else "",
-                "poster_url": poster_url,
-            }
-        )
-        if len(results) == 5:
-            break
-    return results
+    def feed(self, data: bytes | str) -> None:
+        self._parser.feed(data)
+        # With only start/end requested, every event is an (event, element) pair.
+        for event, el in cast(Iterator[tuple[str, ET.Element]], self._parser.read_events()):
+            if event == "start" and el.tag == "channel":
+                self._channel = el
+            elif event == "end" and el.tag == "item":
+                film = _parse_item(el)
+                if film is not None:
+                    self.films.append(film)
+                if self._channel is not None:
+                    self._channel.remove(el)
+                if self.done:
+                    return
+
+    def close(self) -> list[dict]:
+        if not self.done:
+            self._parser.close()
+        return self.films
+
+
+def _parse_item(item: ET.Element) -> dict | None:
+    rating_el = item.find(f"{{{LB_NS}}}memberRating")
+    if rating_el is None:
+        return None
+    title_el = item.find(f"{{{LB_NS}}}filmTitle")
+    year_el = item.find(f"{{{LB_NS}}}filmYear")
+    link_el = item.find("link")
+    desc_el = item.find("description")
+    poster_url = None
+    if desc_el is not None and desc_el.text:
+        m = re.search(r'<img src="([^"]+)"', desc_el.text)
+        if m:
+            poster_url = m.group(1)
+    return {
+        "title": title_el.text if title_el is not None else "",
+        "year": int(year_el.text) if year_el is not None and year_el.text is not None else None,
+        "rating": float(rating_el.text) if rating_el.text is not None else 0.0,
+        "url": link_el.text if link_el is not None else "",
+        "poster_url": poster_url,
+    }
 
 
 @router.get("/letterboxd")
 @limiter.limit("10/minute")
-async def get_recently_watched(request: Request) -> list[dict]:
-    now = time.time()
-    if _cache.get("expires", 0) > now:
-        return _cache["data"]
-
+async def get_recently_watched(
+    request: Request,
+    client: httpx.AsyncClient = Depends(get_http_client),
+) -> list[dict]:
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(RSS_URL)
-            response.raise_for_status()
-        films = _parse_feed(response.text)
-        _cache["data"] = films
-        _cache["expires"] = now + 3600
-        return films
+        return await recent_films(client)
     except Exception:
-        if "data" in _cache:
-            return _cache["data"]
         raise HTTPException(status_code=503, detail="Could not fetch Letterboxd feed")
+
+
+async def recent_films(client: httpx.AsyncClient) -> list[dict]:
+    # run_feed_refresher keeps _cache warm, so normally this never waits on Letterboxd. If the
+    # refresher has fallen behind, serve what we have and let one background fetch catch up.
+    if "data" in _cache:
+        if _cache["expires"] <= time.time():
+            _refreshes.start(RSS_URL, lambda: _refresh_feed(client))
+        return _cache["data"]
+
+    # Cold start: nothing fetched yet (e.g. the refresher's first attempt is still in flight).
+    return await _refreshes.do(RSS_URL, lambda: _refresh_feed(client))
+
+
+async def run_feed_refresher(client: httpx.AsyncClient, interval: float | None = None) -> None:
+    """Refresh the feed forever on a schedule; started by the app lifespan."""
+    interval = settings.LETTERBOXD_REFRESH_SECONDS if interval is None else interval
+    failures = 0
+    while True:
+        try:
+            await _refreshes.do(RSS_URL, lambda: _refresh_feed(client))
+            failures = 0
+            delay = interval
+        except Exception as exc:
+            failures += 1
+            delay = _backoff_delay(failures, interval)
+            logger.warning("Letterboxd refresh failed (attempt %d), retrying in %.0fs: %r", failures, delay, exc)
+        await asyncio.sleep(delay)
+
+
+def _backoff_delay(failures: int, cap: float) -> float:
+    # Exponential backoff with jitter, so a Letterboxd outage doesn't get a retry every few seconds.
+    base = min(cap, RETRY_BASE_SECONDS * 2 ** (failures - 1))
+    return base / 2 + random.uniform(0, base / 2)
+
+
+async def _refresh_feed(client: httpx.AsyncClient) -> list[dict]:
+    parser = _FeedParser()
+    async with client.stream("GET", RSS_URL, timeout=LETTERBOXD_TIMEOUT) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            parser.feed(chunk)
+            # Only the newest few films are shown; stop downloading once we have them.
+            if parser.done:
+                break
+    films = parser.close()
+    _cache["data"] = films
+    _cache["expires"] = time.time() + settings.LETTERBOXD_REFRESH_SECONDS
+    response_cache.invalidate("bootstrap")
+    return films
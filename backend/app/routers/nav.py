@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.nav_link import NavLink
 from app.models.page import Page
 from app.schemas.nav_link import NavLinkOut
@@ -11,10 +12,12 @@ router = APIRouter(tags=["public"])
 
 
 @router.get("/nav-links", response_model=list[NavLinkOut])
-async def list_nav_links(db: AsyncSession = Depends(get_db)) -> list[NavLinkOut]:
+async def list_nav_links(db: AsyncSession = Depends(get_read_db)) -> list[NavLinkOut]:
     stmt = (
         select(NavLink)
         .outerjoin(NavLink.page)
+        # Fill NavLink.page from the join the filter needs; links only use its title and slug, not its body.
+        .options(contains_eager(NavLink.page).defer(Page.content).defer(Page.content_html))
         .where(or_(Page.published == True, NavLink.page_id == None))  # noqa: E711,E712
         .order_by(NavLink.position.asc())
     )
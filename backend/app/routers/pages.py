@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
-from app.database import get_db
+from app.conditional import is_not_modified, make_etag, validator_headers
+from app.database import get_read_db
 from app.models.page import Page
-from app.schemas.page import PageOut
+from app.rendering import render_markdown_async
+from app.responses import model_response
+from app.schemas.page import PageDetail, PageSummary
 
 router = APIRouter(tags=["public"])
 
 
-@router.get("/pages/{slug}", response_model=PageOut)
-async def get_page(slug: str, db: AsyncSession = Depends(get_db)) -> PageOut:
-    page = (
-        await db.execute(select(Page).where(Page.slug == slug, Page.published == True))  # noqa: E712
-    ).scalar_one_or_none()
-    if not page:
+@router.get("/pages/{slug}", response_model=PageDetail)
+async def get_page(
+    slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+) -> PageDetail | Response:
+    version = (
+        await db.execute(select(Page.id, Page.updated_at).where(Page.slug == slug, Page.published == True))  # noqa: E712
+    ).one_or_none()
+    if not version:
         raise HTTPException(status_code=404, detail="Page not found")
-    return page  # type: ignore[return-value]
+    etag = make_etag("page", "html", version.id, version.updated_at.isoformat())
+    headers = validator_headers(etag, version.updated_at)
+    if is_not_modified(request, etag, version.updated_at):
+        return Response(status_code=304, headers=headers)
+
+    page = (await db.execute(select(Page).options(defer(Page.content)).where(Page.id == version.id))).scalar_one()
+    content_html = page.content_html
+    if content_html is None:
+        # Written before content_html existed and not backfilled yet: render on the fly.
+        content_html = await render_markdown_async(
+            (await db.execute(select(Page.content).where(Page.id == page.id))).scalar_one()
+        )
+    detail = PageDetail(**dict(PageSummary.model_validate(page)), content_html=content_html)
+    response.headers.update(headers)
+    return model_response(PageDetail, detail, headers)
@@ -1,51 +1,182 @@
 import math
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Select, and_, false, func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
-from app.models.post import Post
+from app.cache import post_counts
+from app.conditional import is_not_modified, make_etag, validator_headers
+from app.cursors import decode_cursor, encode_cursor
+from app.database import get_read_db
+from app.models.post import Post, post_tags
 from app.models.tag import Tag
-from app.schemas.post import PaginatedPosts, PostOut
-from app.schemas.tag import TagOut
+from app.post_queries import fetch_posts
+from app.rendering import render_markdown_async
+from app.responses import model_response
+from app.schemas.post import PaginatedPosts, PostDetail, PostSearchResults, PostSummary
+from app.schemas.tag import TagWithCount
+from app.search import search_posts
 
 router = APIRouter(tags=["public"])
 
 
+class _StoredPost(PostSummary):
+    content_html: str | None
+
+
 @router.get("/posts", response_model=PaginatedPosts)
 async def list_posts(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     tag: str | None = Query(None),
-    db: AsyncSession = Depends(get_db),
+    after: str | None = Query(None, description="Cursor mode: return posts older than this cursor"),
+    before: str | None = Query(None, description="Cursor mode: return posts newer than this cursor"),
+    include_total: bool = Query(True, description="Set to false to skip total/pages, e.g. for infinite scroll"),
+    db: AsyncSession = Depends(get_read_db),
+) -> PaginatedPosts:
+    listing = await paginate_posts(db, page, size, tag, after, before, include_total)
+    return model_response(PaginatedPosts, listing)
+
+
+async def paginate_posts(
+    db: AsyncSession,
+    page: int = 1,
+    size: int = 10,
+    tag: str | None = None,
+    after: str | None = None,
+    before: str | None = None,
+    include_total: bool = True,
 ) -> PaginatedPosts:
+    if after is not None and before is not None:
+        raise HTTPException(status_code=400, detail="Use either after or before, not both")
+
+    # fetch_posts leaves the (potentially large) body columns in Postgres; PostSummary has no content.
     stmt = select(Post).where(Post.published == True)  # noqa: E712
+    tag_id = None
     if tag:
-        stmt = stmt.join(Post.tags).where(Tag.slug == tag)
-    total = (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar() or 0
-    posts = (
-        (await db.execute(stmt.order_by(Post.created_at.desc()).offset((page - 1) * size).limit(size))).scalars().all()
-    )
+        # Resolve the slug up front so the filter is a plain tag_id lookup on ix_post_tags_tag_id_post_id
+        # rather than a join through tags; an unknown tag matches nothing.
+        tag_id = (await db.execute(select(Tag.id).where(Tag.slug == tag))).scalar_one_or_none()
+        tagged = select(post_tags.c.post_id).where(post_tags.c.tag_id == tag_id)
+        stmt = stmt.where(Post.id.in_(tagged) if tag_id is not None else false())
+    total = None
+    if include_total:
+        # Counts are cached per tag id, so made-up ?tag= values never take up a slot.
+        total = 0 if tag and tag_id is None else await _count_published(db, stmt, tag_id)
+    pages = (math.ceil(total / size) if total else 1) if total is not None else None
+    newest_first = (Post.created_at.desc(), Post.id.desc())
+
+    if after is None and before is None:
+        rows = await fetch_posts(
+            db, stmt.order_by(*newest_first).offset((page - 1) * size).limit(size + 1), PostSummary
+        )
+        posts = rows[:size]
+        return PaginatedPosts(
+            items=posts,
+            total=total,
+            page=page,
+            size=size,
+            pages=pages,
+            next_cursor=_encode_cursor(posts[-1]) if len(rows) > size else None,
+            prev_cursor=_encode_cursor(posts[0]) if posts and page > 1 else None,
+        )
+
+    # Keyset pagination: seek past the cursor on (created_at, id) instead of OFFSET so every page
+    # costs the same, and fetch one extra row to learn whether another page follows.
+    key = tuple_(Post.created_at, Post.id)
+    if after is not None:
+        stmt = stmt.where(key < _decode_cursor(after)).order_by(*newest_first)
+    elif before is not None:
+        stmt = stmt.where(key > _decode_cursor(before)).order_by(Post.created_at.asc(), Post.id.asc())
+    rows = await fetch_posts(db, stmt.limit(size + 1), PostSummary)
+    has_more = len(rows) > size
+    posts = rows[:size] if after is not None else rows[:size][::-1]
+
+    # Walking forward there is always a newer page behind us; walking backward, an older one.
+    next_cursor = prev_cursor = None
+    if posts:
+        if after is not None:
+            next_cursor = _encode_cursor(posts[-1]) if has_more else None
+            prev_cursor = _encode_cursor(posts[0])
+        else:
+            next_cursor = _encode_cursor(posts[-1])
+            prev_cursor = _encode_cursor(posts[0]) if has_more else None
     return PaginatedPosts(
-        items=posts,  # type: ignore[arg-type]
+        items=posts,
         total=total,
-        page=page,
+        page=None,
         size=size,
-        pages=math.ceil(total / size) if total else 1,
+        pages=pages,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
     )
 
 
-@router.get("/posts/{slug}", response_model=PostOut)
-async def get_post(slug: str, db: AsyncSession = Depends(get_db)) -> PostOut:
-    post = (
-        await db.execute(select(Post).where(Post.slug == slug, Post.published == True))  # noqa: E712
-    ).scalar_one_or_none()
-    if not post:
+@router.get("/posts/search", response_model=PostSearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    size: int = Query(10, ge=1, le=50),
+    after: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_read_db),
+) -> PostSearchResults:
+    results = await search_posts(db, q, size, after)
+    return model_response(PostSearchResults, results)
+
+
+@router.get("/posts/{slug}", response_model=PostDetail)
+async def get_post(
+    slug: str, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)
+) -> PostDetail | Response:
+    # Check the validators first so a revalidating client never costs us the content column.
+    version = (
+        await db.execute(select(Post.id, Post.updated_at).where(Post.slug == slug, Post.published == True))  # noqa: E712
+    ).one_or_none()
+    if not version:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post  # type: ignore[return-value]
+    etag = make_etag("post", "html", version.id, version.updated_at.isoformat())
+    headers = validator_headers(etag, version.updated_at)
+    if is_not_modified(request, etag, version.updated_at):
+        return Response(status_code=304, headers=headers)
+
+    (post,) = await fetch_posts(db, select(Post).where(Post.id == version.id), _StoredPost, Post.content_html)
+    if post.content_html is None:
+        # Written before content_html existed and not backfilled yet: render on the fly.
+        post.content_html = await render_markdown_async(
+            (await db.execute(select(Post.content).where(Post.id == post.id))).scalar_one()
+        )
+    response.headers.update(headers)
+    return model_response(PostDetail, PostDetail.model_validate(post), headers)
+
+
+@router.get("/tags", response_model=list[TagWithCount])
+async def list_tags(db: AsyncSession = Depends(get_read_db)) -> list[TagWithCount]:
+    # One grouped query; tags without published posts are kept (the admin editor lists them all).
+    published = and_(Post.id == post_tags.c.post_id, Post.published == True)  # noqa: E712
+    stmt = (
+        select(Tag.id, Tag.name, Tag.slug, func.count(Post.id).label("post_count"))
+        .outerjoin(post_tags, post_tags.c.tag_id == Tag.id)
+        .outerjoin(Post, published)
+        .group_by(Tag.id, Tag.name, Tag.slug)
+        .order_by(Tag.name)
+    )
+    return (await db.execute(stmt)).all()  # type: ignore[return-value]
+
+
+async def _count_published(db: AsyncSession, stmt: Select[tuple[Post]], tag_id: int | None) -> int:
+    # Totals only change when the admin writes posts or tags, which clears post_counts, so the
+    # COUNT(*) round-trip is paid once per tag between writes rather than on every page view.
+    async def count() -> int:
+        ids = stmt.with_only_columns(Post.id).subquery()
+        return (await db.execute(select(func.count()).select_from(ids))).scalar() or 0
+
+    return await post_counts.get(tag_id, count)
+
+
+def _encode_cursor(post: PostSummary) -> str:
+    return encode_cursor(post.created_at.isoformat(), post.id)
 
 
-@router.get("/tags", response_model=list[TagOut])
-async def list_tags(db: AsyncSession = Depends(get_db)) -> list[TagOut]:
-    return (await db.execute(select(Tag).order_by(Tag.name))).scalars().all()  # type: ignore[return-value]
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    created_at, post_id = decode_cursor(cursor, datetime.fromisoformat, int)
+    return created_at, post_id
@@ -1,4 +1,4 @@
-import time
+import json
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
@@ -6,36 +6,69 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth import get_current_user
+from app.cache import SingleFlight, TTLCache, game_ids
 from app.config import settings
 from app.database import get_db
+from app.http_client import get_http_client
 from app.limiter import limiter
 from app.models.post_media import PostMedia
 
 router = APIRouter()
 
 RAWG_BASE = "https://api.rawg.io/api"
+RAWG_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
 
-# module-level cache: game_id -> (data, expires_timestamp)
-_game_cache: dict[str, tuple[dict[str, object], float]] = {}
+
+def _json_size(value: object) -> int:
+    return len(json.dumps(value))
+
+
+# game_id -> normalized game detail. Past the hour, entries are still served for a day while a
+# single background fetch refreshes them.
+_game_cache: TTLCache[dict[str, object]] = TTLCache(
+    max_entries=settings.RAWG_CACHE_MAX_ENTRIES,
+    ttl=3600,
+    max_bytes=settings.RAWG_CACHE_MAX_BYTES,
+    sizeof=_json_size,
+    stale_ttl=86400,
+)
+_game_fetches: SingleFlight[dict[str, object]] = SingleFlight()
+# normalized search query -> results; searches are admin-only and change rarely, so a short TTL is enough
+_search_cache: TTLCache[list[dict[str, str | None]]] = TTLCache(
+    max_entries=settings.RAWG_CACHE_MAX_ENTRIES,
+    ttl=600,
+    max_bytes=settings.RAWG_CACHE_MAX_BYTES,
+    sizeof=_json_size,
+)
+
+
+@router.get("/rawg/cache")
+async def rawg_cache_stats(_: object = Depends(get_current_user)) -> dict[str, dict[str, int]]:
+    return {"games": _game_cache.stats(), "search": _search_cache.stats()}
 
 
 @router.get("/rawg/search")
 async def rawg_search(
     q: str = Query(..., min_length=1),
     db: AsyncSession = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
     _: object = Depends(get_current_user),
 ) -> list[dict[str, str | None]]:
     if not q.strip():
         return []
+    query = " ".join(q.lower().split())
+    cached = _search_cache.get(query)
+    if cached is not None:
+        return cached
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                f"{RAWG_BASE}/games",
-                params={"key": settings.RAWG_API_KEY, "search": q, "page_size": 10},
-            )
-            response.raise_for_status()
+        response = await client.get(
+            f"{RAWG_BASE}/games",
+            params={"key": settings.RAWG_API_KEY, "search": q, "page_size": 10},
+            timeout=RAWG_TIMEOUT,
+        )
+        response.raise_for_status()
         results = response.json().get("results", [])
-        return [
+        games: list[dict[str, str | None]] = [
             {
                 "id": str(game["id"]),
                 "name": game["name"],
@@ -47,31 +80,44 @@ async def rawg_search(
         raise HTTPException(status_code=502, detail=f"RAWG API error ({exc.response.status_code})") from exc
     except Exception as exc:
         raise HTTPException(status_code=503, detail="Could not reach RAWG API") from exc
+    _search_cache.set(query, games)
+    return games
 
 
 @router.get("/rawg/games/{game_id}")
 @limiter.limit("20/minute")
-async def rawg_game_detail(request: Request, game_id: str, db: AsyncSession = Depends(get_db)) -> dict[str, object]:
-    exists = (
-        await db.execute(
-            select(PostMedia.id).where(PostMedia.external_id == game_id, PostMedia.media_type == "game").limit(1)
-        )
-    ).scalar_one_or_none()
-    if exists is None:
+async def rawg_game_detail(
+    request: Request,
+    game_id: str,
+    db: AsyncSession = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
+) -> dict[str, object]:
+    # Only games featured in a post are proxied. The known ids are held in memory, so probing
+    # random ids costs neither a query nor a RAWG request.
+    async def featured() -> list[str]:
+        stmt = select(PostMedia.external_id).where(PostMedia.media_type == "game").distinct()
+        return list((await db.execute(stmt)).scalars())
+
+    if not await game_ids.contains(game_id, featured):
         raise HTTPException(status_code=404, detail="Game not found")
 
-    now = time.time()
-    cached = _game_cache.get(game_id)
-    if cached is not None and cached[1] > now:
-        return cached[0]
+    cached = _game_cache.get_stale(game_id)
+    if cached is not None:
+        data, fresh = cached
+        if not fresh:
+            _game_fetches.start(game_id, lambda: _fetch_game(client, game_id))
+        return data
+    return await _game_fetches.do(game_id, lambda: _fetch_game(client, game_id))
 
+
+async def _fetch_game(client: httpx.AsyncClient, game_id: str) -> dict[str, object]:
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                f"{RAWG_BASE}/games/{game_id}",
-                params={"key": settings.RAWG_API_KEY},
-            )
-            response.raise_for_status()
+        response = await client.get(
+            f"{RAWG_BASE}/games/{game_id}",
+            params={"key": settings.RAWG_API_KEY},
+            timeout=RAWG_TIMEOUT,
+        )
+        response.raise_for_status()
     except httpx.HTTPStatusError as exc:
         raise HTTPException(status_code=502, detail=f"RAWG API error ({exc.response.status_code})") from exc
     except Exception as exc:
@@ -107,5 +153,5 @@ async def rawg_game_detail(request: Request, game_id: str, db: AsyncSession = De
         "metacritic_url": raw.get("metacritic_url"),
         "rawg_slug": raw.get("slug", ""),
     }
-    _game_cache[game_id] = (data, now + 3600)
+    _game_cache.set(game_id, data)
     return data
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+from app.schemas.nav_link import NavLinkOut
+from app.schemas.post import PaginatedPosts
+from app.schemas.site_profile import SiteProfileOut
+from app.schemas.social_link import SocialLinkOut
+from app.schemas.tag import TagWithCount
+
+
+class Bootstrap(BaseModel):
+    posts: PaginatedPosts
+    tags: list[TagWithCount]
+    nav_links: list[NavLinkOut]
+    social_links: list[SocialLinkOut]
+    profile: SiteProfileOut
+    letterboxd: list[dict]
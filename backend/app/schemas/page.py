@@ -61,3 +61,9 @@ class PageSummary(BaseModel):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class PageDetail(PageSummary):
+    """The public view of a page: rendered HTML instead of the Markdown source."""
+
+    content_html: str
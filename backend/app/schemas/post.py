@@ -57,9 +57,28 @@ class PostSummary(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class PostDetail(PostSummary):
+    """The public view of a post: rendered HTML instead of the Markdown source."""
+
+    content_html: str
+
+
 class PaginatedPosts(BaseModel):
     items: list[PostSummary]
-    total: int
-    page: int
+    total: int | None
+    page: int | None
+    size: int
+    pages: int | None
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class PostSearchHit(PostSummary):
+    score: float
+    snippet: str
+
+
+class PostSearchResults(BaseModel):
+    items: list[PostSearchHit]
     size: int
-    pages: int
+    next_cursor: str | None = None
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 
 class SiteProfileOut(BaseModel):
     photo_url: str | None = None
+    photo_srcset: str | None = None
     bio: str | None = None
 
     model_config = {"from_attributes": True}
@@ -15,3 +15,7 @@ class TagOut(BaseModel):
     slug: str
 
     model_config = {"from_attributes": True}
+
+
+class TagWithCount(TagOut):
+    post_count: int
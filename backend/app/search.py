@@ -0,0 +1,101 @@
+"""Full-text search over published posts.
+
+Postgres matches against the generated ``posts.search_vector`` column (migration 0012) and ranks
+with ts_rank_cd; SQLite, used by the test suite, goes through the ``posts_fts`` FTS5 table defined
+alongside the Post model. Both return the same shape: posts ordered by descending score, then id,
+with an HTML-escaped snippet whose matches are wrapped in ``<mark>``.
+"""
+
+import html
+import re
+from typing import Any
+
+from sqlalchemy import Select, column, func, literal_column, select, table, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from sqlalchemy.sql.expression import ColumnClause
+
+from app.cursors import decode_cursor, encode_cursor
+from app.models.post import Post
+from app.schemas.post import PostSearchHit, PostSearchResults, PostSummary
+
+SEARCH_CONFIG = "english"
+# Control characters can't appear in post text, so they mark matches safely until the snippet is escaped.
+_START, _STOP = "\x02", "\x03"
+_HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxFragments=2, MaxWords=30, MinWords=10"
+_SNIPPET_TOKENS = 24
+
+_posts_fts = table("posts_fts", column("rowid"))
+
+
+async def search_posts(db: AsyncSession, q: str, size: int, after: str | None) -> PostSearchResults:
+    if db.get_bind().dialect.name == "sqlite":
+        stmt = _sqlite_search(q)
+    else:
+        stmt = _postgres_search(q)
+    if stmt is None:
+        return PostSearchResults(items=[], size=size, next_cursor=None)
+
+    score = stmt.selected_columns.score
+    if after is not None:
+        stmt = stmt.where(tuple_(score, Post.id) < decode_cursor(after, float, int))
+    rows = (await db.execute(stmt.order_by(score.desc(), Post.id.desc()).limit(size + 1))).all()
+
+    items = [
+        PostSearchHit(**dict(PostSummary.model_validate(post)), score=score_, snippet=_mark(snippet_))
+        for post, score_, snippet_ in rows[:size]
+    ]
+    next_cursor = encode_cursor(items[-1].score, items[-1].id) if len(rows) > size else None
+    return PostSearchResults(items=items, size=size, next_cursor=next_cursor)
+
+
+def _postgres_search(q: str) -> Select[Any]:
+    # websearch_to_tsquery accepts anything a user might type ("quoted phrases", -exclusions, or).
+    query = func.websearch_to_tsquery(_search_config(), q)
+    vector: ColumnClause[Any] = literal_column("posts.search_vector")
+    score = func.ts_rank_cd(vector, query)
+    snippet = func.ts_headline(
+        _search_config(), func.concat_ws(" ", Post.excerpt, Post.content), query, _HEADLINE_OPTIONS
+    )
+    return (
+        select(Post, score.label("score"), snippet.label("snippet"))
+        .options(defer(Post.content), defer(Post.content_html))
+        .where(Post.published == True, vector.op("@@")(query))  # noqa: E712
+    )
+
+
+def _search_config() -> ColumnClause[Any]:
+    # Inlined rather than bound: asyncpg would otherwise have to send it as a regconfig parameter.
+    return literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+
+
+def _sqlite_search(q: str) -> Select[Any] | None:
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return None
+    # Quote every term so FTS5 query syntax in the input is matched literally; terms are ANDed.
+    match = " ".join(f'"{term}"' for term in terms)
+    # FTS5 takes the table name itself as the MATCH target and first argument of its functions.
+    fts: ColumnClause[Any] = literal_column("posts_fts")
+    hits = (
+        select(
+            _posts_fts.c.rowid.label("id"),
+            # bm25 is lower-is-better; negate it so both dialects sort by descending score. Title
+            # matches weigh most, then the excerpt.
+            (-func.bm25(fts, 10.0, 5.0, 1.0)).label("score"),
+            func.snippet(fts, -1, _START, _STOP, "…", _SNIPPET_TOKENS).label("snippet"),
+        )
+        .select_from(_posts_fts)
+        .where(fts.op("MATCH")(match))
+        .subquery()
+    )
+    return (
+        select(Post, hits.c.score, hits.c.snippet)
+        .options(defer(Post.content), defer(Post.content_html))
+        .join(hits, hits.c.id == Post.id)
+        .where(Post.published == True)  # noqa: E712
+    )
+
+
+def _mark(snippet: str) -> str:
+    return html.escape(snippet).replace(_START, "<mark>").replace(_STOP, "</mark>")
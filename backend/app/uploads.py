@@ -0,0 +1,129 @@
+"""Writing uploaded images to UPLOAD_DIR, plus the resized WebP copies the public site serves.
+
+Files are named after a hash of the upload (``profile-<hash>.png``, ``profile-<hash>-480.webp``), so a
+URL never changes content and can be cached forever; replacing a photo means new URLs and the old
+files are deleted once nothing references them. Everything here except UploadFiles blocks (file
+I/O, Pillow), so the router calls it through asyncio.to_thread.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from collections.abc import Callable
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+from fastapi.staticfiles import StaticFiles
+from PIL import Image, ImageOps
+from starlette.responses import Response
+from starlette.types import Scope
+
+CHUNK_SIZE = 64 * 1024
+WEBP_QUALITY = 80
+HASH_LENGTH = 16
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_hashed_name = re.compile(rf"[a-z]+-[0-9a-f]{{{HASH_LENGTH}}}(-\d+)?\.\w+")
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def _replace_atomically(dest: Path, write: Callable[[BinaryIO], None]) -> None:
+    fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=".upload-")
+    tmp = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            write(out)
+        os.chmod(tmp, 0o644)  # mkstemp creates files private to the owner
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def staging_file(directory: Path) -> Path:
+    """Create an empty, uniquely named file in directory to receive an upload before it is renamed."""
+    fd, name = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    os.close(fd)
+    return Path(name)
+
+
+def store_upload(src: BinaryIO, dest: Path, max_bytes: int) -> str:
+    """Copy src to dest in chunks, raising UploadTooLarge past max_bytes. dest appears all at once or not at all.
+
+    Returns the content hash to name the stored file by.
+    """
+    size = 0
+    digest = hashlib.sha256()
+
+    def write(out: BinaryIO) -> None:
+        nonlocal size
+        while chunk := src.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge
+            digest.update(chunk)
+            out.write(chunk)
+
+    _replace_atomically(dest, write)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def uploaded_stem(url: str | None, prefix: str) -> str | None:
+    """The "<prefix>-<hash>" stem of an upload URL such as /api/uploads/profile-<hash>-480.webp."""
+    match = re.match(rf"/api/uploads/({prefix}-[0-9a-f]{{{HASH_LENGTH}}})[-.]", url or "")
+    return match[1] if match else None
+
+
+def remove_unreferenced(upload_dir: Path, prefix: str, keep: str | None) -> list[Path]:
+    """Delete the files uploaded under prefix except those named after keep (a "<prefix>-<hash>" stem)."""
+    removed = []
+    for path in upload_dir.glob(f"{prefix}[.-]*"):
+        if keep is not None and (path.name.startswith(f"{keep}-") or path.name.startswith(f"{keep}.")):
+            continue
+        path.unlink(missing_ok=True)
+        removed.append(path)
+    return removed
+
+
+def make_webp_derivatives(src: Path, stem: str, widths: list[int]) -> dict[int, Path]:
+    """Write {stem}-{width}.webp beside src for each width not wider than the image itself.
+
+    Returns the written files by width; a narrow original still gets one copy at its own width.
+    """
+    try:
+        with Image.open(src) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise InvalidImage(str(exc)) from exc
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+    targets = sorted({min(width, image.width) for width in widths})
+    derivatives: dict[int, Path] = {}
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+        dest = src.parent / f"{stem}-{width}.webp"
+        _replace_atomically(dest, lambda out: resized.save(out, "WEBP", quality=WEBP_QUALITY))
+        derivatives[width] = dest
+    return derivatives
+
+
+class UploadFiles(StaticFiles):
+    """StaticFiles that lets browsers and CDNs keep content-hashed uploads forever."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            hashed = _hashed_name.fullmatch(PurePosixPath(path).name)
+            response.headers["Cache-Control"] = IMMUTABLE if hashed else "no-cache"
+        return response
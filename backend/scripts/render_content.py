@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Render post and page Markdown into content_html.
+
+Fills in rows written before content_html existed. Pass --all to re-render every row, e.g. after
+changing the renderer.
+
+Usage (from the backend/ directory with .venv activated):
+    python scripts/render_content.py [--all]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import UTC, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import SessionLocal
+from app.models.page import Page
+from app.models.post import Post
+from app.rendering import render_markdown
+
+BATCH_SIZE = 100
+
+
+async def render_content(db: AsyncSession, model: type[Post] | type[Page], rerender: bool = False) -> int:
+    """Store content_html for rows missing it (every row with rerender); returns how many changed."""
+    rendered = 0
+    last_id = 0
+    while True:
+        stmt = (
+            select(model.id, model.content, model.content_html)
+            .where(model.id > last_id)
+            .order_by(model.id)
+            .limit(BATCH_SIZE)
+        )
+        if not rerender:
+            stmt = stmt.where(model.content_html.is_(None))
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            return rendered
+        for row in rows:
+            html = render_markdown(row.content)
+            if html == row.content_html:
+                continue
+            # updated_at feeds the ETag and Last-Modified of the post/page: bump it when readers would
+            # see different HTML, so they don't keep revalidating to the old copy. A backfill stores
+            # what was already rendered on the fly for them, so it leaves updated_at alone.
+            updated_at = model.updated_at if row.content_html is None else datetime.now(UTC)
+            await db.execute(update(model).where(model.id == row.id).values(content_html=html, updated_at=updated_at))
+            rendered += 1
+        await db.commit()
+        last_id = rows[-1].id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="re-render rows that already have content_html")
+    args = parser.parse_args()
+
+    async with SessionLocal() as db:
+        for model in (Post, Page):
+            count = await render_content(db, model, rerender=args.all)
+            print(f"Rendered {count} {model.__tablename__}.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
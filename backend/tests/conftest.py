@@ -1,16 +1,32 @@
+import os
+from contextlib import asynccontextmanager
+
+import httpx
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.pool import StaticPool
 
-from app.auth import create_access_token, get_password_hash
-from app.database import Base, get_db
+from app import cache
+from app.auth import create_access_token, forget_all_sessions, get_password_hash
+from app.cache import invalidate_all
+from app.database import Base, get_db, get_read_db, get_read_sessions
+from app.http_client import get_http_client
 from app.limiter import limiter
 from app.main import app
 from app.models.user import User
 
 
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("RUN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="set RUN_BENCHMARKS=1 to run benchmarks")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 async def engine():
     """Fresh in-memory SQLite engine per test — no shared state between tests."""
@@ -34,6 +50,25 @@ async def engine():
     await _engine.dispose()
 
 
+@pytest.fixture
+def sql_statements(engine):
+    """Records every SQL statement sent to the test database while the test runs."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def uncached(monkeypatch):
+    """Sends every request to the route, bypassing the response cache."""
+    monkeypatch.setattr(cache, "namespace_for", lambda path: None)
+
+
 @pytest.fixture
 async def db_session(engine):
     session = AsyncSession(engine, expire_on_commit=False)
@@ -47,11 +82,33 @@ async def client(db_session):
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    @asynccontextmanager
+    async def new_read_session():
+        # Endpoints that query concurrently need a session per query rather than the shared one.
+        async with AsyncSession(db_session.bind, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_read_sessions] = lambda: new_read_session
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def mock_upstream():
+    """Routes outbound integration calls to a local handler instead of the network."""
+
+    def install(handler):
+        upstream = AsyncClient(transport=httpx.MockTransport(handler))
+        app.dependency_overrides[get_http_client] = lambda: upstream
+        return upstream
+
+    yield install
+    app.dependency_overrides.pop(get_http_client, None)
+
+
 @pytest.fixture
 async def admin_user(db_session):
     user = User(
@@ -79,3 +136,12 @@ def disable_rate_limits():
     limiter._storage.reset()
     yield
     limiter._storage.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    invalidate_all()
+    forget_all_sessions()
+    yield
+    invalidate_all()
+    forget_all_sessions()
@@ -1,3 +1,22 @@
+import asyncio
+import statistics
+import threading
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth as auth_module
+from app.auth import create_access_token, get_password_hash, verify_password, verify_password_async
+from app.config import settings
+from app.database import get_db
+from app.limiter import limiter
+from app.main import app
+
+
 async def test_login_success(client, admin_user):
     response = await client.post(
         "/api/auth/login",
@@ -69,3 +88,122 @@ async def test_change_password_wrong_current(client, admin_user, auth_cookies):
         cookies=auth_cookies,
     )
     assert response.status_code == 400
+
+
+async def test_repeat_requests_skip_user_lookup(client, auth_cookies, sql_statements):
+    await client.get("/api/admin/posts", cookies=auth_cookies)
+    sql_statements.clear()
+
+    response = await client.get("/api/admin/posts", cookies=auth_cookies)
+    assert response.status_code == 200
+    assert not any("FROM users" in stmt for stmt in sql_statements)
+
+
+async def test_logout_forgets_cached_session(client, auth_cookies, sql_statements):
+    await client.get("/api/admin/posts", cookies=auth_cookies)
+    await client.post("/api/auth/logout", cookies=auth_cookies)
+    sql_statements.clear()
+
+    await client.get("/api/admin/posts", cookies=auth_cookies)
+    assert any("FROM users" in stmt for stmt in sql_statements)
+
+
+async def test_password_change_forgets_cached_sessions(client, auth_cookies, sql_statements):
+    await client.put(
+        "/api/admin/password",
+        json={"current_password": "testpassword", "new_password": "newpassword123"},
+        cookies=auth_cookies,
+    )
+    sql_statements.clear()
+
+    await client.get("/api/admin/posts", cookies=auth_cookies)
+    assert any("FROM users" in stmt for stmt in sql_statements)
+
+
+async def test_cached_session_rejected_after_token_expiry(client, admin_user):
+    token = create_access_token({"sub": admin_user.username}, expires_delta=timedelta(seconds=1))
+    assert (await client.get("/api/admin/posts", cookies={"access_token": token})).status_code == 200
+
+    with patch("app.auth.time.time", return_value=time.time() + 5):
+        response = await client.get("/api/admin/posts", cookies={"access_token": token})
+    assert response.status_code == 401
+
+
+async def test_login_checks_password_off_the_event_loop(client, admin_user):
+    threads = []
+    checkpw = bcrypt.checkpw
+
+    def recording_checkpw(password, hashed):
+        threads.append(threading.current_thread())
+        return checkpw(password, hashed)
+
+    with patch("app.auth.bcrypt.checkpw", recording_checkpw):
+        response = await client.post("/api/auth/login", json={"username": "testadmin", "password": "testpassword"})
+
+    assert response.status_code == 200
+    assert threads and threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("bcrypt")
+
+
+async def test_password_checks_are_capped_at_max_workers():
+    hashed = get_password_hash("secret")
+    running = peak = 0
+    lock = threading.Lock()
+
+    def slow_verify(plain, hashed_password):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return verify_password(plain, hashed_password)
+
+    with patch.object(auth_module, "verify_password", slow_verify):
+        results = await asyncio.gather(*(verify_password_async("secret", hashed) for _ in range(8)))
+
+    assert all(results)
+    assert peak == settings.BCRYPT_MAX_WORKERS
+
+
+@pytest.mark.benchmark
+async def test_benchmark_public_latency_during_logins(client, engine, admin_user):
+    # Each request gets its own session so concurrent logins don't share one.
+    async def session_per_request():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = session_per_request
+    await client.get("/api/posts")  # warm the response cache so only the event loop is measured
+
+    async def public_latencies_during_logins():
+        limiter._storage.reset()
+        logins = [
+            asyncio.create_task(
+                client.post("/api/auth/login", json={"username": "testadmin", "password": "testpassword"})
+            )
+            for _ in range(5)
+        ]
+        latencies = []
+        while not all(task.done() for task in logins):
+            # A request "arrives" every 5 ms; its latency includes any time the loop was too busy to pick it up.
+            arrives = time.perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            await client.get("/api/posts")
+            latencies.append(time.perf_counter() - arrives)
+        assert all(response.status_code == 200 for response in await asyncio.gather(*logins))
+        return statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+
+    async def verify_inline(plain, hashed):
+        return verify_password(plain, hashed)
+
+    offloaded_p95 = await public_latencies_during_logins()
+    with patch("app.routers.auth.verify_password_async", verify_inline):
+        blocking_p95 = await public_latencies_during_logins()
+
+    print(
+        f"\np95 GET /api/posts during 5 logins: inline bcrypt {blocking_p95 * 1000:.1f} ms, "
+        f"pooled {offloaded_p95 * 1000:.1f} ms"
+    )
+    assert offloaded_p95 < blocking_p95
@@ -0,0 +1,79 @@
+import httpx
+
+import app.routers.letterboxd as lb_module
+from app.models.post import Post
+from app.models.site_profile import SiteProfile
+from app.models.social_link import SocialLink
+from app.models.tag import Tag
+from tests.test_letterboxd import SAMPLE_RSS
+
+
+async def _seed(db_session):
+    tag = Tag(name="Python", slug="python")
+    db_session.add_all(
+        [
+            Post(title="Hello", slug="hello", content="body", published=True, tags=[tag]),
+            Post(title="Draft", slug="draft", content="body", published=False),
+            SocialLink(platform="github", url="https://github.com/example", position=0),
+            SiteProfile(id=1, bio="Hi there"),
+        ]
+    )
+    await db_session.commit()
+
+
+async def test_bootstrap_bundles_home_page_data(client, db_session, mock_upstream):
+    await _seed(db_session)
+    lb_module._cache.clear()
+    mock_upstream(lambda request: httpx.Response(200, text=SAMPLE_RSS))
+
+    response = await client.get("/api/bootstrap")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [post["slug"] for post in data["posts"]["items"]] == ["hello"]
+    assert data["posts"]["total"] == 1
+    assert [tag["slug"] for tag in data["tags"]] == ["python"]
+    assert data["nav_links"] == []
+    assert [link["platform"] for link in data["social_links"]] == ["github"]
+    assert data["profile"] == {"photo_url": None, "photo_srcset": None, "bio": "Hi there"}
+    assert [film["title"] for film in data["letterboxd"]] == ["The Matrix", "Inception"]
+
+
+async def test_bootstrap_survives_letterboxd_outage(client, mock_upstream):
+    lb_module._cache.clear()
+    mock_upstream(lambda request: httpx.Response(503))
+
+    response = await client.get("/api/bootstrap")
+
+    assert response.status_code == 200
+    assert response.json()["letterboxd"] == []
+
+
+async def test_bootstrap_cached_until_admin_write(client, auth_cookies, mock_upstream):
+    lb_module._cache.clear()
+    await lb_module._refresh_feed(mock_upstream(lambda request: httpx.Response(200, text=SAMPLE_RSS)))
+
+    assert (await client.get("/api/bootstrap")).headers["x-cache"] == "MISS"
+    assert (await client.get("/api/bootstrap")).headers["x-cache"] == "HIT"
+
+    created = await client.post(
+        "/api/admin/social-links", json={"platform": "github", "url": "https://github.com/x"}, cookies=auth_cookies
+    )
+    assert created.status_code == 201
+
+    response = await client.get("/api/bootstrap")
+    assert response.headers["x-cache"] == "MISS"
+    assert [link["platform"] for link in response.json()["social_links"]] == ["github"]
+
+
+async def test_letterboxd_refresh_invalidates_bootstrap(client, mock_upstream):
+    lb_module._cache.clear()
+    upstream = mock_upstream(lambda request: httpx.Response(200, text=SAMPLE_RSS))
+    await lb_module._refresh_feed(upstream)
+
+    await client.get("/api/bootstrap")
+    assert (await client.get("/api/bootstrap")).headers["x-cache"] == "HIT"
+
+    await lb_module._refresh_feed(upstream)
+
+    assert (await client.get("/api/bootstrap")).headers["x-cache"] == "MISS"
@@ -0,0 +1,197 @@
+import asyncio
+from unittest.mock import patch
+
+from app.cache import LoadedValues, SingleFlight, TTLCache, response_cache
+from app.models.social_link import SocialLink
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl=60)
+    with patch("app.cache.time.monotonic", return_value=1000.0):
+        cache.set("a", 1)
+    with patch("app.cache.time.monotonic", return_value=1059.0):
+        assert cache.get("a") == 1
+    with patch("app.cache.time.monotonic", return_value=1061.0):
+        assert cache.get("a") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_ttl_cache_evicts_oldest_when_over_max_bytes():
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+    assert "a" not in cache
+    assert cache.get("b") == "yyyy"
+    assert cache.total_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_rejects_value_larger_than_max_bytes():
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=4, sizeof=len)
+    cache.set("a", "xx")
+    cache.set("big", "x" * 5)
+    assert "big" not in cache
+    assert cache.get("a") == "xx"
+
+
+def test_ttl_cache_overwrite_replaces_size():
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=100, sizeof=len)
+    cache.set("a", "x" * 40)
+    cache.set("a", "x" * 10)
+    assert cache.total_bytes == 10
+    assert len(cache) == 1
+
+
+def test_ttl_cache_periodic_sweep_drops_unread_expired_entries():
+    with patch("app.cache.time.monotonic", return_value=1000.0):
+        cache = TTLCache(max_entries=10, ttl=150, sweep_interval=120)
+        cache.set("stale", 1)
+    with patch("app.cache.time.monotonic", return_value=1100.0):
+        cache.set("other", 2)
+    assert len(cache) == 2
+    with patch("app.cache.time.monotonic", return_value=1200.0):
+        cache.set("fresh", 3)
+    assert len(cache) == 2
+    assert cache.stats()["expirations"] == 1
+
+
+async def test_public_get_served_from_cache(client, db_session):
+    db_session.add(SocialLink(platform="github", url="https://github.com/x", position=1))
+    await db_session.commit()
+
+    first = await client.get("/api/social-links")
+    assert first.headers["x-cache"] == "MISS"
+
+    # Rows written behind the cache's back are not seen until an admin write invalidates it.
+    db_session.add(SocialLink(platform="mastodon", url="https://example.social/@x", position=2))
+    await db_session.commit()
+
+    second = await client.get("/api/social-links")
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+    assert response_cache.hits == 1
+
+
+async def test_admin_write_invalidates_cache(client, auth_cookies):
+    assert (await client.get("/api/social-links")).json() == []
+
+    await client.post(
+        "/api/admin/social-links",
+        json={"platform": "github", "url": "https://github.com/x"},
+        cookies=auth_cookies,
+    )
+
+    response = await client.get("/api/social-links")
+    assert response.headers["x-cache"] == "MISS"
+    assert len(response.json()) == 1
+
+
+async def test_query_params_are_part_of_cache_key(client):
+    await client.get("/api/posts?page=1")
+    response = await client.get("/api/posts?page=2")
+    assert response.headers["x-cache"] == "MISS"
+
+
+async def test_errors_are_not_cached(client):
+    await client.get("/api/posts/missing")
+    response = await client.get("/api/posts/missing")
+    assert response.status_code == 404
+    assert response.headers["x-cache"] == "MISS"
+
+
+async def test_admin_cache_stats(client, auth_cookies):
+    await client.get("/api/tags")
+    await client.get("/api/tags")
+    response = await client.get("/api/admin/cache", cookies=auth_cookies)
+    assert response.status_code == 200
+    stats = response.json()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_ttl_cache_get_stale_serves_within_grace_period():
+    with patch("app.cache.time.monotonic", return_value=1000.0):
+        cache = TTLCache(max_entries=10, ttl=60, stale_ttl=60)
+        cache.set("a", 1)
+    with patch("app.cache.time.monotonic", return_value=1090.0):
+        assert cache.get("a") is None
+        assert cache.get_stale("a") == (1, False)
+    with patch("app.cache.time.monotonic", return_value=1121.0):
+        assert cache.get_stale("a") is None
+    assert cache.stale_hits == 1
+
+
+async def test_single_flight_collapses_concurrent_calls():
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+    assert results == [1] * 10
+    assert calls == 1
+    assert "key" not in flight
+
+    assert await flight.do("key", fetch) == 2
+
+
+async def test_single_flight_shares_failures():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_single_flight_start_runs_in_background_once():
+    flight = SingleFlight()
+    done = asyncio.Event()
+    calls = 0
+
+    async def refresh():
+        nonlocal calls
+        calls += 1
+        await done.wait()
+        return calls
+
+    flight.start("key", refresh)
+    flight.start("key", refresh)
+    assert "key" in flight
+    done.set()
+    assert await flight.do("key", refresh) == 1
+    assert calls == 1
+
+
+async def test_loaded_values_drops_a_load_that_raced_a_clear():
+    counts = LoadedValues[int](max_entries=2, ttl=60)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        if len(loads) == 1:
+            counts.clear()  # an admin write lands while the query is running
+        return len(loads)
+
+    assert await counts.get("posts", load) == 1
+    assert await counts.get("posts", load) == 2
+    assert await counts.get("posts", load) == 2
+    assert len(loads) == 2
@@ -1,7 +1,13 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+
+import httpx
+import pytest
 
 import app.routers.letterboxd as lb_module
-from app.routers.letterboxd import _parse_feed
 
 SAMPLE_RSS = """<?xml version="1.0" encoding="utf-8"?>
 <rss version="2.0" xmlns:letterboxd="https://letterboxd.com">
@@ -30,8 +36,13 @@ SAMPLE_RSS = """<?xml version="1.0" encoding="utf-8"?>
 </rss>"""
 
 
-def test_parse_feed_unit():
-    films = _parse_feed(SAMPLE_RSS)
+def test_feed_parser_unit():
+    parser = lb_module._FeedParser()
+    raw = SAMPLE_RSS.encode()
+    # Fed in small chunks like the streamed response, so items span chunk boundaries.
+    for start in range(0, len(raw), 64):
+        parser.feed(raw[start : start + 64])
+    films = parser.close()
     assert len(films) == 2  # unrated item excluded
     assert films[0]["title"] == "The Matrix"
     assert films[0]["year"] == 1999
@@ -41,20 +52,11 @@ def test_parse_feed_unit():
     assert films[1]["rating"] == 4.0
 
 
-async def test_letterboxd_endpoint(client):
+async def test_letterboxd_endpoint(client, mock_upstream):
     lb_module._cache.clear()
+    mock_upstream(lambda request: httpx.Response(200, text=SAMPLE_RSS))
 
-    mock_response = MagicMock()
-    mock_response.text = SAMPLE_RSS
-    mock_response.raise_for_status = MagicMock()
-
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get = AsyncMock(return_value=mock_response)
-    mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-    mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-
-    with patch("app.routers.letterboxd.httpx.AsyncClient", return_value=mock_client_instance):
-        response = await client.get("/api/letterboxd")
+    response = await client.get("/api/letterboxd")
 
     assert response.status_code == 200
     films = response.json()
@@ -62,3 +64,178 @@ async def test_letterboxd_endpoint(client):
     assert films[0]["title"] == "The Matrix"
 
     lb_module._cache.clear()
+
+
+async def test_letterboxd_concurrent_misses_fetch_once(client, mock_upstream):
+    lb_module._cache.clear()
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, text=SAMPLE_RSS)
+
+    mock_upstream(handler)
+    responses = await asyncio.gather(*(client.get("/api/letterboxd") for _ in range(5)))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert calls == 1
+
+    lb_module._cache.clear()
+
+
+async def test_letterboxd_serves_stale_while_refreshing(client, mock_upstream):
+    lb_module._cache.clear()
+    lb_module._cache["data"] = [{"title": "Stale Film"}]
+    lb_module._cache["expires"] = 0
+    refreshed = asyncio.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        refreshed.set()
+        return httpx.Response(200, text=SAMPLE_RSS)
+
+    mock_upstream(handler)
+    response = await client.get("/api/letterboxd")
+    assert response.json() == [{"title": "Stale Film"}]
+
+    await asyncio.wait_for(refreshed.wait(), timeout=1)
+    while lb_module.RSS_URL in lb_module._refreshes:
+        await asyncio.sleep(0.001)
+    response = await client.get("/api/letterboxd")
+    assert response.json()[0]["title"] == "The Matrix"
+
+    lb_module._cache.clear()
+
+
+async def test_feed_refresher_fills_cache_and_retries(mock_upstream):
+    lb_module._cache.clear()
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503) if calls == 1 else httpx.Response(200, text=SAMPLE_RSS)
+
+    upstream = mock_upstream(handler)
+    with patch("app.routers.letterboxd._backoff_delay", return_value=0.001):
+        refresher = asyncio.create_task(lb_module.run_feed_refresher(upstream, interval=3600))
+        for _ in range(1000):
+            if "data" in lb_module._cache:
+                break
+            await asyncio.sleep(0.001)
+        refresher.cancel()
+
+    assert calls == 2
+    assert lb_module._cache["data"][0]["title"] == "The Matrix"
+    lb_module._cache.clear()
+
+
+async def test_letterboxd_endpoint_serves_refreshed_feed_from_memory(client, mock_upstream):
+    lb_module._cache.clear()
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, text=SAMPLE_RSS)
+
+    upstream = mock_upstream(handler)
+    await lb_module._refresh_feed(upstream)
+
+    for _ in range(3):
+        response = await client.get("/api/letterboxd")
+        assert response.json()[0]["title"] == "The Matrix"
+    assert calls == 1
+    lb_module._cache.clear()
+
+
+def test_backoff_delay_grows_with_jitter_and_is_capped():
+    assert 15 <= lb_module._backoff_delay(1, cap=3600) <= 30
+    assert 60 <= lb_module._backoff_delay(3, cap=3600) <= 120
+    assert lb_module._backoff_delay(20, cap=3600) <= 3600
+
+
+def _synthetic_feed_items(count):
+    review = "Review text. " * 50
+    for i in range(count):
+        yield f"""
+    <item>
+      <letterboxd:filmTitle>Film {i}</letterboxd:filmTitle>
+      <letterboxd:filmYear>2000</letterboxd:filmYear>
+      <letterboxd:memberRating>3.5</letterboxd:memberRating>
+      <link>https://letterboxd.com/rawool7/film/film-{i}/</link>
+      <description><![CDATA[<p><img src="https://a.ltximg.com/{i}.jpg" /></p><p>{review}</p>]]></description>
+    </item>"""
+
+
+def _synthetic_feed_chunks(count):
+    yield '<?xml version="1.0" encoding="utf-8"?>\n<rss version="2.0" xmlns:letterboxd="https://letterboxd.com"><channel>'
+    yield from _synthetic_feed_items(count)
+    yield "</channel></rss>"
+
+
+async def test_refresh_feed_stops_reading_after_limit(mock_upstream):
+    lb_module._cache.clear()
+    pulled = 0
+
+    async def body():
+        nonlocal pulled
+        for chunk in _synthetic_feed_chunks(500):
+            pulled += 1
+            yield chunk.encode()
+
+    upstream = mock_upstream(lambda request: httpx.Response(200, content=body()))
+    films = await lb_module._refresh_feed(upstream)
+
+    assert [f["title"] for f in films] == [f"Film {i}" for i in range(5)]
+    assert pulled < 10
+    lb_module._cache.clear()
+
+
+def _parse_feed_whole_document(xml_text):
+    # The pre-streaming implementation: build the full tree, then walk it.
+    root = ET.fromstring(xml_text)
+    results = []
+    for item in root.find("channel").findall("item"):
+        film = lb_module._parse_item(item)
+        if film is not None:
+            results.append(film)
+        if len(results) == 5:
+            break
+    return results
+
+
+@pytest.mark.benchmark
+def test_benchmark_streaming_parse_vs_whole_document():
+    xml_text = "".join(_synthetic_feed_chunks(5000))
+    chunk_size = 16 * 1024
+    raw = xml_text.encode()
+
+    def streaming():
+        parser = lb_module._FeedParser()
+        for start in range(0, len(raw), chunk_size):
+            parser.feed(raw[start : start + chunk_size])
+            if parser.done:
+                break
+        return parser.close()
+
+    def measure(fn):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak
+
+    whole, whole_time, whole_peak = measure(lambda: _parse_feed_whole_document(xml_text))
+    streamed, stream_time, stream_peak = measure(streaming)
+
+    print(
+        f"\nfeed {len(raw) / 1e6:.1f} MB: whole document {whole_time * 1000:.1f} ms / {whole_peak / 1e6:.1f} MB peak, "
+        f"streaming {stream_time * 1000:.2f} ms / {stream_peak / 1e3:.0f} KB peak"
+    )
+    assert streamed == whole
+    assert stream_time < whole_time
+    assert stream_peak < whole_peak
@@ -0,0 +1,26 @@
+from app.models.nav_link import NavLink
+from app.models.page import Page
+
+
+async def test_nav_links_skip_draft_pages_with_one_join(client, db_session, sql_statements):
+    about = Page(title="About", slug="about", content="About me", published=True)
+    draft = Page(title="Draft", slug="draft", content="Not yet", published=False)
+    db_session.add_all(
+        [
+            NavLink(page=about, position=1),
+            NavLink(page=draft, position=2),
+            NavLink(custom_label="GitHub", custom_url="https://github.com", position=3),
+        ]
+    )
+    await db_session.commit()
+    db_session.expunge_all()
+    sql_statements.clear()
+
+    links = (await client.get("/api/nav-links")).json()
+    assert [(link["page"] and link["page"]["slug"], link["custom_label"]) for link in links] == [
+        ("about", None),
+        (None, "GitHub"),
+    ]
+    (statement,) = sql_statements
+    assert statement.count("JOIN pages") == 1
+    assert "pages.content" not in statement
@@ -42,3 +42,20 @@ async def test_get_page_published(client, auth_cookies):
     response = await client.get("/api/pages/live-page")
     assert response.status_code == 200
     assert response.json()["title"] == "Live Page"
+
+
+async def test_get_page_if_none_match_is_304(client, auth_cookies):
+    await client.post(
+        "/api/admin/pages",
+        json={"title": "Cached Page", "slug": "cached-page", "content": "# Hi", "published": True},
+        cookies=auth_cookies,
+    )
+    etag = (await client.get("/api/pages/cached-page")).headers["etag"]
+
+    response = await client.get("/api/pages/cached-page", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.put("/api/admin/pages/1", json={"content": "# Changed"}, cookies=auth_cookies)
+    response = await client.get("/api/pages/cached-page", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["content_html"] == "<h1>Changed</h1>\n"
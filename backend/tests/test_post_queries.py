@@ -0,0 +1,123 @@
+import time
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.limiter import limiter
+from app.models.post import Post
+from app.models.post_media import PostMedia
+from app.models.tag import Tag
+from app.post_queries import with_relations
+
+
+async def _seed(db, count, tags_per_post=3, media_per_post=2):
+    tags = [Tag(name=f"Tag {i}", slug=f"tag-{i}") for i in range(tags_per_post)]
+    db.add_all(
+        Post(
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            content="Lorem ipsum. " * 100,
+            content_html="<p>Lorem ipsum.</p>",
+            published=True,
+            tags=tags,
+            media=[
+                PostMedia(media_type="game", external_id=f"{i}-{m}", title=f"Game {m}", background_image_url=None)
+                for m in range(media_per_post)
+            ],
+        )
+        for i in range(count)
+    )
+    db.add(Post(title="Bare", slug="bare", content="No tags", content_html="<p>No tags</p>", published=True))
+    await db.commit()
+    db.expunge_all()
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/api/posts?size=20",
+        "/api/posts?tag=tag-1&size=3&page=2",
+        "/api/posts/post-2",
+        "/api/posts/bare",
+        "/api/admin/posts",
+        "/api/admin/posts/3",
+    ],
+)
+async def test_aggregated_relations_match_orm_loading(client, db_session, auth_cookies, uncached, monkeypatch, path):
+    await _seed(db_session, 6)
+
+    monkeypatch.setattr(settings, "AGGREGATE_POST_RELATIONS", False)
+    orm = await client.get(path, cookies=auth_cookies)
+    monkeypatch.setattr(settings, "AGGREGATE_POST_RELATIONS", True)
+    aggregated = await client.get(path, cookies=auth_cookies)
+
+    assert aggregated.status_code == orm.status_code == 200
+    assert aggregated.json() == orm.json()
+
+
+async def test_tag_filter_still_returns_every_tag(client, db_session, uncached):
+    await _seed(db_session, 2)
+    items = (await client.get("/api/posts?tag=tag-1")).json()["items"]
+    assert [t["slug"] for t in items[0]["tags"]] == ["tag-0", "tag-1", "tag-2"]
+    assert len(items[0]["media"]) == 2
+
+
+@pytest.mark.parametrize(("aggregate", "statements"), [(True, 1), (False, 3)])
+async def test_listing_statement_count(
+    client, db_session, uncached, sql_statements, monkeypatch, aggregate, statements
+):
+    monkeypatch.setattr(settings, "AGGREGATE_POST_RELATIONS", aggregate)
+    await _seed(db_session, 5)
+    sql_statements.clear()
+    response = await client.get("/api/posts?include_total=false")
+    assert len(response.json()["items"]) == 6
+    assert len(sql_statements) == statements
+
+
+def test_postgres_statement_aggregates_json():
+    # The suite runs on SQLite, so only check what the Postgres flavour compiles to.
+    stmt = with_relations(select(Post).join(Post.tags).where(Tag.slug == "python"), "postgresql")
+    sql = str(stmt.compile(dialect=postgresql.asyncpg.dialect()))
+    assert "json_agg(json_build_object('id', tags.id, 'name', tags.name, 'slug', tags.slug) ORDER BY tags.id)" in sql
+    assert "'[]'::json" in sql
+    # The tag filter's join must not leak into the tags subquery.
+    assert "FROM post_tags JOIN tags ON tags.id = post_tags.tag_id \nWHERE post_tags.post_id = posts.id" in sql
+    assert "posts.content" not in sql
+
+
+@pytest.mark.benchmark
+async def test_benchmark_aggregated_relations(client, engine, db_session, uncached, sql_statements, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    await _seed(db_session, 200)
+    rtt = 0.001
+
+    # In-memory SQLite has no network; charge each statement a round-trip like a nearby Postgres.
+    def round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(rtt)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", round_trip)
+    paths = ["/api/posts?size=20&page=3", "/api/posts?tag=tag-1&size=20", "/api/posts/post-7"]
+    rounds = 30
+    results = {}
+    try:
+        for aggregate in (False, True):
+            monkeypatch.setattr(settings, "AGGREGATE_POST_RELATIONS", aggregate)
+            for path in paths:
+                await client.get(path)  # warm up
+            sql_statements.clear()
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for path in paths:
+                    assert (await client.get(path)).status_code == 200
+            elapsed = time.perf_counter() - started
+            results[aggregate] = (len(sql_statements) / rounds / len(paths), elapsed / rounds / len(paths) * 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", round_trip)
+
+    for aggregate, (statements, ms) in results.items():
+        label = "json aggregation" if aggregate else "ORM selectin"
+        print(f"\n{label}: {statements:.1f} statements, {ms:.2f} ms per request ({rtt * 1000:.0f} ms simulated RTT)")
+    assert results[True][0] < results[False][0]
+    assert results[True][1] < results[False][1]
@@ -1,3 +1,7 @@
+from sqlalchemy import insert
+
+import app.routers.admin as admin_module
+from app.models.post import Post
 from app.models.tag import Tag
 
 
@@ -121,3 +125,83 @@ async def test_create_duplicate_tag(client, auth_cookies):
     r2 = await client.post("/api/admin/tags", json=payload, cookies=auth_cookies)
     assert r1.status_code == 201
     assert r2.status_code == 409
+
+
+async def test_admin_list_posts_does_not_fetch_content(client, auth_cookies, db_session, sql_statements):
+    payload = {"title": "Admin Listed", "content": "Body", "published": False, "tag_ids": [], "media": []}
+    await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    db_session.expunge_all()
+    sql_statements.clear()
+
+    response = await client.get("/api/admin/posts", cookies=auth_cookies)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert not any("posts.content" in stmt for stmt in sql_statements)
+
+
+async def _seed_slugs(db, *slugs):
+    db.add_all(Post(title=slug, slug=slug, content="Body", published=False) for slug in slugs)
+    await db.commit()
+
+
+async def test_slug_for_hundreds_of_colliding_titles_takes_one_query(client, auth_cookies, db_session, sql_statements):
+    await _seed_slugs(db_session, "same", *(f"same-{i}" for i in range(1, 300)), "same-title", "samesies")
+    payload = {"title": "Same", "content": "Body", "published": False, "tag_ids": [], "media": []}
+
+    slugs = []
+    for _ in range(5):
+        sql_statements.clear()
+        response = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+        assert response.status_code == 201
+        slugs.append(response.json()["slug"])
+        assert len([stmt for stmt in sql_statements if "SELECT posts.slug" in stmt]) == 1
+    assert slugs == [f"same-{i}" for i in range(300, 305)]
+
+
+async def test_slug_fills_the_first_free_suffix(client, auth_cookies, db_session):
+    await _seed_slugs(db_session, "gap", "gap-2", "gap-3")
+    payload = {"title": "Gap", "content": "Body", "published": False, "tag_ids": [], "media": []}
+    response = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert response.json()["slug"] == "gap-1"
+
+
+async def test_reserved_slug_gets_a_suffix(client, auth_cookies):
+    payload = {"title": "Search", "content": "Body", "published": True, "tag_ids": [], "media": []}
+    response = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert response.json()["slug"] == "search-1"
+    assert (await client.get("/api/posts/search-1")).status_code == 200
+
+
+async def test_slug_taken_by_a_concurrent_create_is_retried(client, auth_cookies, db_session, monkeypatch):
+    tag = await _create_tag(db_session, "Racing")
+    real_unique_slug = admin_module._unique_slug
+    calls = []
+
+    async def racing_unique_slug(db, title):
+        slug = await real_unique_slug(db, title)
+        if not calls:
+            # Another request inserts the same slug after our check but before our commit.
+            await db.execute(insert(Post).values(title=title, slug=slug, content="Other", published=False))
+            await db.commit()
+        calls.append(slug)
+        return slug
+
+    monkeypatch.setattr(admin_module, "_unique_slug", racing_unique_slug)
+    payload = {"title": "Race", "content": "Body", "published": True, "tag_ids": [tag.id], "media": []}
+    response = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert response.status_code == 201
+    assert response.json()["slug"] == "race-1"
+    assert response.json()["tags"][0]["slug"] == "racing"
+    assert calls == ["race", "race-1"]
+
+
+async def test_slug_retries_give_up_with_409(client, auth_cookies, db_session, monkeypatch):
+    await _seed_slugs(db_session, "taken")
+
+    async def always_taken(db, title):
+        return "taken"
+
+    monkeypatch.setattr(admin_module, "_unique_slug", always_taken)
+    payload = {"title": "Anything", "content": "Body", "published": False, "tag_ids": [], "media": []}
+    response = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert response.status_code == 409
@@ -1,14 +1,15 @@
+from app.cache import invalidate_all, post_counts
 from app.models.post import Post
 from app.models.tag import Tag
 
 
-async def _create_post(db, title, published=True, tags=None):
+async def _create_post(db, title, published=True, tags=None, content=None):
     from slugify import slugify
 
     post = Post(
         title=title,
         slug=slugify(title),
-        content=f"Content of {title}",
+        content=content or f"Content of {title}",
         published=published,
         tags=tags or [],
     )
@@ -92,3 +93,217 @@ async def test_list_posts_tag_filter(client, db_session):
     data = response.json()
     assert data["total"] == 1
     assert data["items"][0]["title"] == "Python Post"
+
+
+async def test_list_posts_cursor_walks_forward(client, db_session):
+    for i in range(5):
+        await _create_post(db_session, f"Cursor Post {i}", published=True)
+
+    first = (await client.get("/api/posts?size=2")).json()
+    assert [p["title"] for p in first["items"]] == ["Cursor Post 4", "Cursor Post 3"]
+    assert first["prev_cursor"] is None
+
+    second = (await client.get(f"/api/posts?size=2&after={first['next_cursor']}")).json()
+    assert [p["title"] for p in second["items"]] == ["Cursor Post 2", "Cursor Post 1"]
+    assert second["page"] is None
+    assert second["total"] == 5
+
+    third = (await client.get(f"/api/posts?size=2&after={second['next_cursor']}")).json()
+    assert [p["title"] for p in third["items"]] == ["Cursor Post 0"]
+    assert third["next_cursor"] is None
+
+
+async def test_list_posts_cursor_walks_backward(client, db_session):
+    for i in range(5):
+        await _create_post(db_session, f"Cursor Post {i}", published=True)
+
+    first = (await client.get("/api/posts?size=2")).json()
+    second = (await client.get(f"/api/posts?size=2&after={first['next_cursor']}")).json()
+
+    back = (await client.get(f"/api/posts?size=2&before={second['prev_cursor']}")).json()
+    assert [p["title"] for p in back["items"]] == ["Cursor Post 4", "Cursor Post 3"]
+    assert back["prev_cursor"] is None
+    assert back["next_cursor"] == first["next_cursor"]
+
+
+async def test_list_posts_invalid_cursor_is_400(client):
+    response = await client.get("/api/posts?after=not-a-cursor")
+    assert response.status_code == 400
+
+
+async def test_list_posts_after_and_before_is_400(client, db_session):
+    for i in range(3):
+        await _create_post(db_session, f"Cursor Post {i}", published=True)
+    cursor = (await client.get("/api/posts?size=1")).json()["next_cursor"]
+    response = await client.get(f"/api/posts?after={cursor}&before={cursor}")
+    assert response.status_code == 400
+
+
+async def test_list_posts_without_total(client, db_session):
+    for i in range(3):
+        await _create_post(db_session, f"Scroll Post {i}", published=True)
+
+    data = (await client.get("/api/posts?size=2&include_total=false")).json()
+    assert data["total"] is None
+    assert data["pages"] is None
+    assert len(data["items"]) == 2
+    assert data["next_cursor"] is not None
+
+
+async def test_list_posts_total_refreshes_after_admin_write(client, auth_cookies):
+    payload = {"title": "Counted", "content": "Body", "published": True, "tag_ids": [], "media": []}
+    await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert (await client.get("/api/posts")).json()["total"] == 1
+
+    created = await client.post("/api/admin/posts", json=payload, cookies=auth_cookies)
+    assert (await client.get("/api/posts")).json()["total"] == 2
+
+    await client.delete(f"/api/admin/posts/{created.json()['id']}", cookies=auth_cookies)
+    assert (await client.get("/api/posts")).json()["total"] == 1
+
+
+async def test_unknown_tags_are_not_counted_or_cached(client, db_session, sql_statements):
+    await _create_post(db_session, "Tagged", tags=[Tag(name="Python", slug="python")])
+    sql_statements.clear()
+
+    for i in range(5):
+        response = await client.get(f"/api/posts?tag=missing-{i}")
+        assert response.json()["total"] == 0
+    assert not any("count(" in statement.lower() for statement in sql_statements)
+    assert len(post_counts) == 0
+
+    assert (await client.get("/api/posts?tag=python")).json()["total"] == 1
+    assert len(post_counts) == 1
+
+
+async def test_list_posts_does_not_fetch_content(client, db_session, sql_statements):
+    await _create_post(db_session, "Long Read", published=True)
+    db_session.expunge_all()
+    sql_statements.clear()
+
+    response = await client.get("/api/posts")
+    assert response.status_code == 200
+    assert "content" not in response.json()["items"][0]
+    assert sql_statements
+    assert not any("posts.content" in stmt for stmt in sql_statements)
+
+
+async def test_get_post_sets_validators(client, db_session):
+    post = await _create_post(db_session, "Validated Post", published=True)
+    response = await client.get(f"/api/posts/{post.slug}")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["last-modified"].endswith("GMT")
+
+
+async def test_get_post_if_none_match_is_304(client, db_session, sql_statements):
+    post = await _create_post(db_session, "Unchanged Post", published=True)
+    etag = (await client.get(f"/api/posts/{post.slug}")).headers["etag"]
+
+    invalidate_all()
+    db_session.expunge_all()
+    sql_statements.clear()
+    response = await client.get(f"/api/posts/{post.slug}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert not any("posts.content" in stmt for stmt in sql_statements)
+
+
+async def test_get_post_if_none_match_from_cache_is_304(client, db_session):
+    post = await _create_post(db_session, "Cached Post", published=True)
+    etag = (await client.get(f"/api/posts/{post.slug}")).headers["etag"]
+
+    response = await client.get(f"/api/posts/{post.slug}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["x-cache"] == "HIT"
+
+
+async def test_get_post_if_modified_since_is_304(client, db_session):
+    post = await _create_post(db_session, "Dated Post", published=True)
+    last_modified = (await client.get(f"/api/posts/{post.slug}")).headers["last-modified"]
+
+    invalidate_all()
+    response = await client.get(f"/api/posts/{post.slug}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+
+async def test_get_post_etag_changes_after_update(client, auth_cookies, db_session):
+    tag = await _create_tag(db_session, "Retagged")
+    created = await client.post(
+        "/api/admin/posts",
+        json={"title": "Evolving Post", "content": "v1", "published": True, "tag_ids": [], "media": []},
+        cookies=auth_cookies,
+    )
+    etag = (await client.get("/api/posts/evolving-post")).headers["etag"]
+
+    await client.put(f"/api/admin/posts/{created.json()['id']}", json={"tag_ids": [tag.id]}, cookies=auth_cookies)
+
+    response = await client.get("/api/posts/evolving-post", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["tags"][0]["name"] == "Retagged"
+
+
+async def test_list_tags_counts_published_posts(client, db_session):
+    python = await _create_tag(db_session, "Python")
+    rust = await _create_tag(db_session, "Rust")
+    await _create_tag(db_session, "Unused")
+    await _create_post(db_session, "Snakes", tags=[python, rust])
+    await _create_post(db_session, "More Snakes", tags=[python])
+    await _create_post(db_session, "Draft Snakes", published=False, tags=[python])
+
+    response = await client.get("/api/tags")
+    assert [(t["name"], t["post_count"]) for t in response.json()] == [("Python", 2), ("Rust", 1), ("Unused", 0)]
+
+
+async def test_list_tags_statement_count_is_constant(client, db_session, sql_statements):
+    tags = [await _create_tag(db_session, f"Tag {i}") for i in range(3)]
+    await _create_post(db_session, "Only Post", tags=tags)
+    sql_statements.clear()
+    await client.get("/api/tags")
+    few_posts = list(sql_statements)
+
+    for i in range(40):
+        await _create_post(db_session, f"Post {i}", tags=tags)
+    invalidate_all()
+    sql_statements.clear()
+    response = await client.get("/api/tags")
+    assert response.json()[0]["post_count"] == 41
+
+    assert len(sql_statements) == len(few_posts) == 1
+    assert "posts.content" not in sql_statements[0]
+
+
+async def test_delete_tag_does_not_load_its_posts(client, auth_cookies, db_session, sql_statements):
+    tag = await _create_tag(db_session, "Doomed")
+    post = await _create_post(db_session, "Tagged Post", tags=[tag])
+    db_session.expunge_all()
+    sql_statements.clear()
+
+    response = await client.delete(f"/api/admin/tags/{tag.id}", cookies=auth_cookies)
+    assert response.status_code == 204
+    assert not any("posts.content" in stmt for stmt in sql_statements)
+    assert (await client.get(f"/api/posts/{post.slug}")).json()["tags"] == []
+
+
+async def test_tag_filter_uses_post_tags_index(client, db_session, sql_statements):
+    python = await _create_tag(db_session, "Python")
+    other = await _create_tag(db_session, "Other")
+    for i in range(20):
+        await _create_post(db_session, f"Post {i}", tags=[python] if i % 2 else [other])
+
+    sql_statements.clear()
+    response = await client.get("/api/posts?tag=python&size=5")
+    assert response.json()["total"] == 10
+
+    # The page query and the total both filter on the resolved tag id.
+    filtered = [stmt for stmt in sql_statements if "post_tags.tag_id = ?" in stmt]
+    assert len(filtered) == 2
+    conn = await db_session.connection()
+    for statement in filtered:
+        # SQLite plans without looking at the bound values, so placeholders will do.
+        parameters = (None,) * statement.count("?")
+        plan = "\n".join(row[-1] for row in await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        assert "USING COVERING INDEX ix_post_tags_tag_id_post_id (tag_id=?)" in plan, plan
+        assert "SCAN post_tags" not in plan, plan
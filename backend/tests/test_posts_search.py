@@ -0,0 +1,94 @@
+from tests.test_posts_public import _create_post
+
+
+async def test_search_finds_published_posts(client, db_session):
+    await _create_post(db_session, "Hiking in the Alps", content="We walked for days through mountain passes.")
+    await _create_post(db_session, "Baking bread", content="Flour, water, salt and patience.")
+    await _create_post(db_session, "Draft about mountains", content="Unfinished mountain notes.", published=False)
+
+    response = await client.get("/api/posts/search", params={"q": "mountain"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [hit["title"] for hit in data["items"]] == ["Hiking in the Alps"]
+    assert "content" not in data["items"][0]
+    assert data["next_cursor"] is None
+
+
+async def test_search_ranks_title_matches_first(client, db_session):
+    await _create_post(db_session, "Notes", content="A long digression that eventually mentions python once.")
+    await _create_post(db_session, "Python tips", content="Some tips.")
+
+    response = await client.get("/api/posts/search", params={"q": "python"})
+
+    hits = response.json()["items"]
+    assert [hit["title"] for hit in hits] == ["Python tips", "Notes"]
+    assert hits[0]["score"] > hits[1]["score"]
+
+
+async def test_search_snippet_highlights_and_escapes(client, db_session):
+    await _create_post(db_session, "Markup", content="Use <script> tags sparingly when embedding widgets.")
+
+    response = await client.get("/api/posts/search", params={"q": "widgets"})
+
+    snippet = response.json()["items"][0]["snippet"]
+    assert "<mark>widgets</mark>" in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<script>" not in snippet
+
+
+async def test_search_matches_stemmed_words(client, db_session):
+    await _create_post(db_session, "Running", content="I ran and kept running every morning.")
+
+    response = await client.get("/api/posts/search", params={"q": "runs"})
+
+    assert [hit["title"] for hit in response.json()["items"]] == ["Running"]
+
+
+async def test_search_tolerates_query_syntax(client, db_session):
+    await _create_post(db_session, "Quotes", content='He said "hello" (twice) - AND then left*.')
+
+    response = await client.get("/api/posts/search", params={"q": '"hello" AND (twice* -'})
+
+    assert response.status_code == 200
+    assert [hit["title"] for hit in response.json()["items"]] == ["Quotes"]
+
+
+async def test_search_reflects_updates_and_deletes(client, db_session, auth_cookies):
+    post = await _create_post(db_session, "Gardening", content="Tomatoes and basil.")
+
+    await client.put(f"/api/admin/posts/{post.id}", json={"content": "Peppers and chillies."}, cookies=auth_cookies)
+    assert (await client.get("/api/posts/search", params={"q": "tomatoes"})).json()["items"] == []
+    assert len((await client.get("/api/posts/search", params={"q": "peppers"})).json()["items"]) == 1
+
+    await client.delete(f"/api/admin/posts/{post.id}", cookies=auth_cookies)
+    assert (await client.get("/api/posts/search", params={"q": "peppers"})).json()["items"] == []
+
+
+async def test_search_cursor_pagination(client, db_session):
+    for i in range(7):
+        await _create_post(db_session, f"Travel diary {i}", content="travel " * (i + 1))
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "travel", "size": 3} | ({"after": cursor} if cursor else {})
+        data = (await client.get("/api/posts/search", params=params)).json()
+        seen.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({hit["id"] for hit in seen}) == 7
+    assert [hit["score"] for hit in seen] == sorted((hit["score"] for hit in seen), reverse=True)
+
+
+async def test_search_invalid_cursor(client):
+    response = await client.get("/api/posts/search", params={"q": "x", "after": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_search_requires_query(client):
+    assert (await client.get("/api/posts/search")).status_code == 422
+    assert (await client.get("/api/posts/search", params={"q": "!!!"})).json()["items"] == []
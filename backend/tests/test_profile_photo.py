@@ -0,0 +1,180 @@
+import hashlib
+import io
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.config import settings
+from app.uploads import CHUNK_SIZE, IMMUTABLE, UploadFiles, UploadTooLarge, staging_file, store_upload
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _png(width, height):
+    # Noise on a gradient: roughly photo-like, so PNG can't compress it away.
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 40).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(image, noise, 0.3).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def _stem(data):
+    return f"profile-{hashlib.sha256(data).hexdigest()[:16]}"
+
+
+async def _upload(client, auth_cookies, data, content_type="image/png", name="me.png"):
+    return await client.post(
+        "/api/admin/profile/photo",
+        files={"file": (name, data, content_type)},
+        cookies=auth_cookies,
+    )
+
+
+async def test_upload_writes_webp_derivatives(client, auth_cookies, upload_dir):
+    original = _png(1200, 900)
+    stem = _stem(original)
+    response = await _upload(client, auth_cookies, original)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["photo_url"] == f"/api/uploads/{stem}-720.webp"
+    assert data["photo_srcset"] == ", ".join(f"/api/uploads/{stem}-{w}.webp {w}w" for w in (240, 480, 720))
+
+    assert (upload_dir / f"{stem}.png").read_bytes() == original
+    for width in (240, 480, 720):
+        with Image.open(upload_dir / f"{stem}-{width}.webp") as image:
+            assert image.format == "WEBP"
+            assert image.size == (width, width * 3 // 4)
+    assert (upload_dir / f"{stem}-720.webp").stat().st_size < len(original) / 10
+    assert sorted(p.name for p in upload_dir.iterdir()) == [
+        f"{stem}-240.webp",
+        f"{stem}-480.webp",
+        f"{stem}-720.webp",
+        f"{stem}.png",
+    ]
+
+    public = await client.get("/api/profile")
+    assert public.json()["photo_srcset"] == data["photo_srcset"]
+
+
+async def test_small_upload_is_not_upscaled(client, auth_cookies, upload_dir):
+    original = _png(300, 300)
+    response = await _upload(client, auth_cookies, original)
+    stem = _stem(original)
+    assert response.json()["photo_srcset"] == f"/api/uploads/{stem}-240.webp 240w, /api/uploads/{stem}-300.webp 300w"
+
+
+async def test_new_upload_removes_previous_files(client, auth_cookies, upload_dir):
+    (upload_dir / "profile.png").write_bytes(b"from before hashed names")
+    (upload_dir / "unrelated.txt").write_bytes(b"kept")
+    await _upload(client, auth_cookies, _png(300, 300))
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 200), "red").save(buf, "JPEG")
+    response = await _upload(client, auth_cookies, buf.getvalue(), "image/jpeg", "me.jpg")
+    assert response.status_code == 200
+    stem = _stem(buf.getvalue())
+    assert sorted(p.name for p in upload_dir.iterdir()) == [f"{stem}-200.webp", f"{stem}.jpg", "unrelated.txt"]
+
+
+async def test_upload_over_size_limit_is_rejected(client, auth_cookies, upload_dir, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_MAX_BYTES", 1000)
+    response = await _upload(client, auth_cookies, _png(300, 300))
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_store_upload_stops_at_limit(tmp_path):
+    class Endless(io.RawIOBase):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return b"x" * size
+
+    src = Endless()
+    with pytest.raises(UploadTooLarge):
+        store_upload(src, tmp_path / "out.bin", 10 * CHUNK_SIZE)
+    assert src.reads == 11
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_staging_files_are_unique(tmp_path):
+    first, second = staging_file(tmp_path), staging_file(tmp_path)
+    assert first != second
+    assert first.parent == second.parent == tmp_path
+
+
+async def test_failed_upload_leaves_no_staging_file(client, auth_cookies, upload_dir, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("app.routers.admin.make_webp_derivatives", broken)
+    with pytest.raises(RuntimeError):
+        await _upload(client, auth_cookies, _png(300, 300))
+    assert list(upload_dir.iterdir()) == []
+
+
+async def test_invalid_image_keeps_current_photo(client, auth_cookies, upload_dir):
+    original = _png(300, 300)
+    first = (await _upload(client, auth_cookies, original)).json()
+    response = await _upload(client, auth_cookies, b"not an image")
+    assert response.status_code == 400
+    assert (await client.get("/api/admin/profile", cookies=auth_cookies)).json() == first
+    stem = _stem(original)
+    assert sorted(p.name for p in upload_dir.iterdir()) == [f"{stem}-240.webp", f"{stem}-300.webp", f"{stem}.png"]
+
+
+async def test_changing_photo_url_drops_srcset_and_files(client, auth_cookies, upload_dir):
+    uploaded = (await _upload(client, auth_cookies, _png(300, 300))).json()
+
+    kept = await client.put(
+        "/api/admin/profile", json={"photo_url": uploaded["photo_url"], "bio": "Hi"}, cookies=auth_cookies
+    )
+    assert kept.json()["photo_srcset"] == uploaded["photo_srcset"]
+    assert len(list(upload_dir.iterdir())) == 3
+
+    replaced = await client.put(
+        "/api/admin/profile", json={"photo_url": "https://example.com/me.jpg", "bio": "Hi"}, cookies=auth_cookies
+    )
+    assert replaced.json() == {"photo_url": "https://example.com/me.jpg", "photo_srcset": None, "bio": "Hi"}
+    assert list(upload_dir.iterdir()) == []
+
+
+async def test_saving_bio_keeps_photo_uploaded_before_hashed_names(client, auth_cookies, upload_dir):
+    (upload_dir / "profile.jpg").write_bytes(b"from before hashed names")
+    payload = {"photo_url": "/api/uploads/profile.jpg", "bio": "Hi"}
+    await client.put("/api/admin/profile", json=payload, cookies=auth_cookies)
+
+    saved = await client.put("/api/admin/profile", json=payload | {"bio": "Hello"}, cookies=auth_cookies)
+    assert saved.json()["photo_url"] == "/api/uploads/profile.jpg"
+    assert (upload_dir / "profile.jpg").exists()
+
+
+async def test_saving_bio_leaves_upload_dir_alone(client, auth_cookies, upload_dir):
+    uploaded = (await _upload(client, auth_cookies, _png(300, 300))).json()
+    (upload_dir / "profile-leftover.png").write_bytes(b"stray")
+    await client.put("/api/admin/profile", json={"photo_url": uploaded["photo_url"], "bio": "Hi"}, cookies=auth_cookies)
+    assert len(list(upload_dir.iterdir())) == 4
+
+
+async def test_hashed_uploads_are_served_immutable(tmp_path):
+    (tmp_path / "profile-0123456789abcdef-240.webp").write_bytes(b"webp")
+    (tmp_path / "profile.png").write_bytes(b"png")
+    files = Starlette(routes=[Mount("/api/uploads", UploadFiles(directory=tmp_path))])
+    async with AsyncClient(transport=ASGITransport(app=files), base_url="http://test") as ac:
+        hashed = await ac.get("/api/uploads/profile-0123456789abcdef-240.webp")
+        assert hashed.headers["cache-control"] == IMMUTABLE
+        revalidated = await ac.get(
+            "/api/uploads/profile-0123456789abcdef-240.webp", headers={"if-none-match": hashed.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.headers["cache-control"] == IMMUTABLE
+        assert (await ac.get("/api/uploads/profile.png")).headers["cache-control"] == "no-cache"
+        assert "cache-control" not in (await ac.get("/api/uploads/missing.png")).headers
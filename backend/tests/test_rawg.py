@@ -1,60 +1,65 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
 
 import app.routers.rawg as rawg_module
+from app.cache import LoadedSet
 from app.models.post_media import PostMedia
 
+FAKE_GAME = {
+    "name": "Half-Life 2",
+    "slug": "half-life-2",
+    "description_raw": "A great game.",
+    "released": "2004-11-16",
+    "esrb_rating": {"name": "Mature"},
+    "metacritic": 96,
+    "metacritic_url": "https://metacritic.com/game/half-life-2",
+    "genres": [{"name": "Action"}, {"name": "Shooter"}],
+    "platforms": [{"platform": {"name": "PC"}}],
+    "developers": [{"name": "Valve"}],
+    "publishers": [{"name": "Valve"}],
+}
 
-async def test_rawg_game_detail_no_post_media_is_404(client):
-    rawg_module._game_cache.clear()
-    response = await client.get("/api/rawg/games/99999")
-    assert response.status_code == 404
-
-
-async def test_rawg_game_detail_with_post_media(client, auth_cookies, db_session):
-    rawg_module._game_cache.clear()
 
+async def _create_game_media(db, external_id="123"):
     from app.models.post import Post
 
     post = Post(title="Half-Life 2 Review", slug="half-life-2-review", content="Body", published=True)
-    db_session.add(post)
-    await db_session.commit()
-    await db_session.refresh(post)
+    db.add(post)
+    await db.commit()
+    await db.refresh(post)
 
     media = PostMedia(
         post_id=post.id,
         media_type="game",
-        external_id="123",
+        external_id=external_id,
         title="Half-Life 2",
         background_image_url="https://example.com/cover.jpg",
     )
-    db_session.add(media)
-    await db_session.commit()
-
-    fake_response_data = {
-        "name": "Half-Life 2",
-        "slug": "half-life-2",
-        "description_raw": "A great game.",
-        "released": "2004-11-16",
-        "esrb_rating": {"name": "Mature"},
-        "metacritic": 96,
-        "metacritic_url": "https://metacritic.com/game/half-life-2",
-        "genres": [{"name": "Action"}, {"name": "Shooter"}],
-        "platforms": [{"platform": {"name": "PC"}}],
-        "developers": [{"name": "Valve"}],
-        "publishers": [{"name": "Valve"}],
-    }
-
-    mock_response = MagicMock()
-    mock_response.json.return_value = fake_response_data
-    mock_response.raise_for_status = MagicMock()
-
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get = AsyncMock(return_value=mock_response)
-    mock_client_instance.__aenter__ = AsyncMock(return_value=mock_client_instance)
-    mock_client_instance.__aexit__ = AsyncMock(return_value=False)
-
-    with patch("app.routers.rawg.httpx.AsyncClient", return_value=mock_client_instance):
-        response = await client.get("/api/rawg/games/123")
+    db.add(media)
+    await db.commit()
+
+
+async def test_rawg_game_detail_no_post_media_is_404(client):
+    rawg_module._game_cache.clear()
+    response = await client.get("/api/rawg/games/99999")
+    assert response.status_code == 404
+
+
+async def test_rawg_game_detail_with_post_media(client, db_session, mock_upstream):
+    rawg_module._game_cache.clear()
+    await _create_game_media(db_session)
+
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        return httpx.Response(200, json=FAKE_GAME)
+
+    mock_upstream(handler)
+    response = await client.get("/api/rawg/games/123")
 
     assert response.status_code == 200
     data = response.json()
@@ -62,3 +67,102 @@ async def test_rawg_game_detail_with_post_media(client, auth_cookies, db_session
     assert "Action" in data["genres"]
     assert "PC" in data["platforms"]
     assert data["rawg_slug"] == "half-life-2"
+
+    await client.get("/api/rawg/games/123")
+    assert requested == ["/api/games/123"]
+    assert rawg_module._game_cache.stats()["hits"] == 1
+
+
+async def test_rawg_game_detail_upstream_error_is_502(client, db_session, mock_upstream):
+    rawg_module._game_cache.clear()
+    await _create_game_media(db_session)
+    mock_upstream(lambda request: httpx.Response(500))
+
+    response = await client.get("/api/rawg/games/123")
+    assert response.status_code == 502
+
+
+async def test_rawg_search(client, auth_cookies, mock_upstream):
+    rawg_module._search_cache.clear()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["search"])
+        return httpx.Response(200, json={"results": [{"id": 7, "name": "Portal", "background_image": None}]})
+
+    mock_upstream(handler)
+    response = await client.get("/api/rawg/search?q=portal", cookies=auth_cookies)
+    assert response.status_code == 200
+    assert response.json() == [{"id": "7", "name": "Portal", "background_image": None}]
+
+    # Served from the search cache, regardless of case and spacing.
+    response = await client.get("/api/rawg/search?q=%20Portal", cookies=auth_cookies)
+    assert response.json() == [{"id": "7", "name": "Portal", "background_image": None}]
+    assert calls == ["portal"]
+
+
+def test_shared_client_is_reused():
+    from app.http_client import get_http_client
+
+    assert get_http_client() is get_http_client()
+
+
+async def test_rawg_game_detail_serves_stale_while_refreshing(client, db_session, mock_upstream):
+    rawg_module._game_cache.clear()
+    await _create_game_media(db_session)
+    with patch("app.cache.time.monotonic", return_value=time.monotonic() - 7200):
+        rawg_module._game_cache.set("123", {"name": "Old Name"})
+
+    refreshed = asyncio.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        refreshed.set()
+        return httpx.Response(200, json=FAKE_GAME)
+
+    mock_upstream(handler)
+    response = await client.get("/api/rawg/games/123")
+    assert response.json() == {"name": "Old Name"}
+
+    await asyncio.wait_for(refreshed.wait(), timeout=1)
+    while "123" in rawg_module._game_fetches:
+        await asyncio.sleep(0.001)
+    response = await client.get("/api/rawg/games/123")
+    assert response.json()["name"] == "Half-Life 2"
+
+
+async def test_rawg_unknown_game_ids_skip_the_database(client, db_session, sql_statements):
+    await _create_game_media(db_session)
+    assert (await client.get("/api/rawg/games/1")).status_code == 404
+    sql_statements.clear()
+
+    for game_id in range(2, 12):
+        assert (await client.get(f"/api/rawg/games/{game_id}")).status_code == 404
+    assert sql_statements == []
+
+
+async def test_rawg_game_added_to_a_post_is_served(client, auth_cookies, mock_upstream):
+    rawg_module._game_cache.clear()
+    mock_upstream(lambda request: httpx.Response(200, json=FAKE_GAME))
+    assert (await client.get("/api/rawg/games/220")).status_code == 404
+
+    media = {"media_type": "game", "external_id": "220", "title": "Half-Life 2"}
+    await client.post(
+        "/api/admin/posts",
+        json={"title": "HL2", "content": "Body", "published": True, "tag_ids": [], "media": [media]},
+        cookies=auth_cookies,
+    )
+    assert (await client.get("/api/rawg/games/220")).status_code == 200
+
+
+async def test_loaded_set_drops_a_load_that_raced_a_clear():
+    known = LoadedSet()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        known.clear()  # an admin write lands while the query is running
+        return ["old"]
+
+    assert await known.contains("old", load)
+    assert await known.contains("old", load)
+    assert len(loads) == 2
@@ -0,0 +1,141 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select, update
+
+from app.limiter import limiter
+from app.models.page import Page
+from app.models.post import Post
+from app.rendering import render_markdown
+from scripts.render_content import render_content
+
+LONG_MARKDOWN = (
+    "## Section\n\nSome *emphasis*, a [link](https://example.com) and `inline code`.\n\n"
+    "| a | b |\n|---|--:|\n| 1 | 2 |\n\n```python\nprint('hello')\n```\n\n- [x] done\n- [ ] todo\n\n"
+) * 200
+
+
+def test_render_markdown_gfm():
+    html = render_markdown("| a | b |\n|:--|--:|\n| 1 | 2 |\n\n- [x] done\n\n~~old~~ https://example.com")
+    assert '<th style="text-align:left">a</th>' in html
+    assert 'type="checkbox"' in html
+    assert "<s>old</s>" in html
+    assert '<a href="https://example.com" rel="noopener noreferrer">' in html
+
+
+def test_render_markdown_is_sanitized():
+    html = render_markdown('<script>alert(1)</script>\n\n[x](javascript:alert(1)) <img src=x onerror="alert(1)">')
+    assert "<script>" not in html
+    assert "javascript:" not in html.replace("[x](javascript:alert(1))", "")
+    assert "onerror" not in html or "&lt;img" in html
+
+
+def test_render_markdown_code_and_terminal_blocks():
+    html = render_markdown("```python\nx = '<b>'\n```\n\n```terminal\n#prompt ~>\n$ make test\n\nok\n```")
+    assert "<code class=\"language-python\">x = '&lt;b&gt;'" in html
+    assert '<span class="text-green-400 select-none">~&gt; </span>' in html
+    assert '<span class="text-stone-900 dark:text-white">make test</span>' in html
+    assert '<div class="h-3"></div><div class="text-gray-400">ok</div>' in html
+
+
+async def test_post_html_rendered_on_write_and_served(client, auth_cookies):
+    created = await client.post(
+        "/api/admin/posts", json={"title": "Rendered", "content": "# Hello", "published": True}, cookies=auth_cookies
+    )
+    assert created.status_code == 201
+    await client.put(f"/api/admin/posts/{created.json()['id']}", json={"content": "# Updated"}, cookies=auth_cookies)
+
+    with patch("app.routers.posts.render_markdown_async", side_effect=AssertionError("rendered on read")):
+        response = await client.get("/api/posts/rendered")
+
+    assert response.status_code == 200
+    assert response.json()["content_html"] == "<h1>Updated</h1>\n"
+    assert "content" not in response.json()
+
+
+async def test_unrendered_rows_render_on_read(client, db_session):
+    db_session.add_all(
+        [
+            Post(title="Legacy", slug="legacy", content="**old**", published=True),
+            Page(title="Legacy Page", slug="legacy-page", content="**old page**", published=True),
+        ]
+    )
+    await db_session.commit()
+
+    assert (await client.get("/api/posts/legacy")).json()["content_html"] == "<p><strong>old</strong></p>\n"
+    assert (await client.get("/api/pages/legacy-page")).json()["content_html"] == "<p><strong>old page</strong></p>\n"
+
+
+async def test_backfill_renders_missing_html(db_session):
+    db_session.add_all(
+        [
+            Post(title="One", slug="one", content="*one*"),
+            Post(title="Two", slug="two", content="*two*", content_html="<p>kept</p>"),
+            Page(title="Page", slug="page", content="*page*"),
+        ]
+    )
+    await db_session.commit()
+    before = dict((await db_session.execute(select(Post.slug, Post.updated_at))).all())
+
+    assert await render_content(db_session, Post) == 1
+    assert await render_content(db_session, Page) == 1
+    assert await render_content(db_session, Post) == 0
+
+    db_session.expunge_all()
+    posts = {post.slug: post for post in (await db_session.execute(select(Post))).scalars()}
+    assert posts["one"].content_html == "<p><em>one</em></p>\n"
+    assert posts["two"].content_html == "<p>kept</p>"
+    assert {slug: post.updated_at for slug, post in posts.items()} == before
+    page = (await db_session.execute(select(Page))).scalar_one()
+    assert page.content_html == "<p><em>page</em></p>\n"
+
+    # Only "two" renders differently; its new HTML gets a new updated_at.
+    assert await render_content(db_session, Post, rerender=True) == 1
+    db_session.expunge_all()
+    after = dict((await db_session.execute(select(Post.slug, Post.updated_at))).all())
+    assert after["one"] == before["one"]
+    assert after["two"] > before["two"]
+
+
+async def test_rerender_changes_post_validators(client, db_session, uncached):
+    db_session.add(Post(title="Post", slug="post", content="*new*", content_html="<p>old</p>", published=True))
+    await db_session.commit()
+    first = await client.get("/api/posts/post")
+    assert first.json()["content_html"] == "<p>old</p>"
+
+    await render_content(db_session, Post, rerender=True)
+    again = await client.get("/api/posts/post", headers={"if-none-match": first.headers["etag"]})
+    assert again.status_code == 200
+    assert again.json()["content_html"] == "<p><em>new</em></p>\n"
+    assert again.headers["etag"] != first.headers["etag"]
+
+
+@pytest.mark.benchmark
+async def test_benchmark_stored_html_vs_render_on_read(client, db_session, uncached, monkeypatch):
+    monkeypatch.setattr(limiter, "enabled", False)
+    db_session.add(Post(title="Long", slug="long", content=LONG_MARKDOWN, published=True))
+    await db_session.commit()
+    rounds = 50
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        render_markdown(LONG_MARKDOWN)
+    render_ms = (time.perf_counter() - started) / rounds * 1000
+
+    async def throughput():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            assert (await client.get("/api/posts/long")).status_code == 200
+        return rounds / (time.perf_counter() - started)
+
+    on_read = await throughput()
+    await db_session.execute(update(Post).values(content_html=render_markdown(LONG_MARKDOWN)))
+    await db_session.commit()
+    stored = await throughput()
+
+    print(
+        f"\n{len(LONG_MARKDOWN) / 1000:.0f} KB of Markdown renders in {render_ms:.1f} ms; "
+        f"GET post {on_read:.0f} req/s rendering on read, {stored:.0f} req/s from stored HTML"
+    )
+    assert stored > on_read
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from sqlalchemy import select
+
+from app.config import settings
+from app.limiter import limiter
+from app.main import app
+from app.models.post import Post
+from app.models.tag import Tag
+from app.rendering import render_markdown
+from app.responses import ModelResponse
+from app.routers.posts import paginate_posts
+from app.schemas.post import PaginatedPosts, PostDetail
+
+
+async def _seed_posts(db, count, tags_per_post=3):
+    tags = [Tag(name=f"Tag {i}", slug=f"tag-{i}") for i in range(tags_per_post)]
+    content = "Lorem ipsum dolor sit amet. " * 200
+    db.add_all(
+        Post(
+            title=f"Post {i}",
+            slug=f"post-{i}",
+            content=content,
+            content_html=render_markdown(content),
+            published=True,
+            tags=tags,
+        )
+        for i in range(count)
+    )
+    await db.commit()
+    # Load from the database on each request rather than reusing these instances.
+    db.expunge_all()
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/posts?size=5", "/api/posts?size=2&page=2", "/api/posts/post-1", "/api/bootstrap"]
+)
+async def test_fast_responses_match_response_model_output(client, db_session, uncached, monkeypatch, path):
+    await _seed_posts(db_session, 5)
+
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    slow = await client.get(path)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = await client.get(path)
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.headers["content-type"] == slow.headers["content-type"]
+    assert fast.headers.get("etag") == slow.headers.get("etag")
+    assert fast.json() == slow.json()
+
+
+@pytest.mark.benchmark
+async def test_benchmark_fast_json_responses(client, db_session, uncached, monkeypatch):
+    await _seed_posts(db_session, 50)
+    monkeypatch.setattr(limiter, "enabled", False)
+    listing = await paginate_posts(db_session, size=50)
+    post = (await db_session.execute(select(Post).where(Post.slug == "post-1"))).scalar_one()
+    rounds = 200
+
+    def response_field(path):
+        return next(route for route in app.routes if getattr(route, "path", None) == path).response_field
+
+    async def render_with_response_model(field, content):
+        return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+    async def render_with_model_response(schema, content):
+        return ModelResponse(schema, content).body
+
+    async def timed(render, *args):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await render(*args)
+        return (time.perf_counter() - started) / rounds
+
+    async def throughput(path):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            assert (await client.get(path)).status_code == 200
+        return rounds / (time.perf_counter() - started)
+
+    cases = [
+        ("/api/posts?size=50", "/api/posts", PaginatedPosts, listing),
+        ("/api/posts/post-1", "/api/posts/{slug}", PostDetail, post),
+    ]
+    for url, route_path, schema, content in cases:
+        before = await timed(render_with_response_model, response_field(route_path), content)
+        after = await timed(render_with_model_response, schema, content)
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        before_rps = await throughput(url)
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        after_rps = await throughput(url)
+        print(
+            f"\n{url}: serialization {before * 1e6:.0f} -> {after * 1e6:.0f} us, "
+            f"end to end {before_rps:.0f} -> {after_rps:.0f} req/s"
+        )
+        assert after < before
@@ -0,0 +1,16 @@
+import client from './client'
+
+let pending = null
+
+// Everything the layout and home page need on first paint, in one request. Components that mount
+// together share the in-flight request; later mounts fetch again (the API serves it from cache).
+export function getBootstrap() {
+  if (!pending) {
+    pending = client.get('/bootstrap').then((res) => res.data)
+    const clear = () => {
+      pending = null
+    }
+    pending.then(clear, clear)
+  }
+  return pending
+}
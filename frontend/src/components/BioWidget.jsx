@@ -1,13 +1,12 @@
 import { useState, useEffect } from 'react'
-import client from '../api/client'
+import { getBootstrap } from '../api/bootstrap'
 
 export default function BioWidget() {
   const [profile, setProfile] = useState(null)
 
   useEffect(() => {
-    client
-      .get('/profile')
-      .then((res) => setProfile(res.data))
+    getBootstrap()
+      .then((data) => setProfile(data.profile))
       .catch(() => {})
   }, [])
 
@@ -19,7 +18,13 @@ export default function BioWidget() {
         About Me
       </h2>
       {profile.photo_url && (
-        <img src={profile.photo_url} alt="Profile" className="rounded-xl w-full object-cover" />
+        <img
+          src={profile.photo_url}
+          srcSet={profile.photo_srcset || undefined}
+          sizes="208px"
+          alt="Profile"
+          className="rounded-xl w-full object-cover"
+        />
       )}
       {profile.bio && <p className="text-sm text-white dark:text-navy-100 mt-3">{profile.bio}</p>}
     </aside>
@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react'
 import { FontAwesomeIcon } from '@fortawesome/react-fontawesome'
 import { faStar } from '@fortawesome/free-solid-svg-icons'
 import { faLetterboxd } from '@fortawesome/free-brands-svg-icons'
-import client from '../api/client'
+import { getBootstrap } from '../api/bootstrap'
 
 function StarRating({ rating }) {
   return (
@@ -16,9 +16,8 @@ export default function LetterboxdWidget() {
   const [films, setFilms] = useState([])
 
   useEffect(() => {
-    client
-      .get('/letterboxd')
-      .then((res) => setFilms(res.data))
+    getBootstrap()
+      .then((data) => setFilms(data.letterboxd))
       .catch(() => {})
   }, [])
 
@@ -1,7 +1,8 @@
-import { useEffect } from 'react'
+import { useEffect, useRef } from 'react'
 import ReactMarkdown from 'react-markdown'
 import remarkGfm from 'remark-gfm'
 import rehypeHighlight from 'rehype-highlight'
+import hljs from 'highlight.js/lib/common'
 import { useTheme } from '../hooks/useTheme'
 import 'github-markdown-css/github-markdown.css'
 import darkHljsUrl from 'highlight.js/styles/atom-one-dark.css?url'
@@ -22,8 +23,10 @@ const mdComponents = {
   },
 }
 
-export default function MarkdownRenderer({ content }) {
+// `html` is the sanitized HTML the API renders from Markdown on save; `content` is raw Markdown.
+export default function MarkdownRenderer({ content, html }) {
   const { isDark } = useTheme()
+  const bodyRef = useRef(null)
 
   useEffect(() => {
     let el = document.getElementById('hljs-theme')
@@ -39,6 +42,27 @@ export default function MarkdownRenderer({ content }) {
     }
   }, [isDark])
 
+  useEffect(() => {
+    if (html == null) return
+    bodyRef.current?.querySelectorAll('pre code[class*="language-"]').forEach((el) => {
+      const lang = el.className.match(/\blanguage-(\S+)/)?.[1]
+      if (lang && hljs.getLanguage(lang)) {
+        hljs.highlightElement(el)
+      }
+    })
+  }, [html])
+
+  if (html != null) {
+    return (
+      <div
+        ref={bodyRef}
+        className="markdown-body"
+        data-theme={isDark ? 'dark' : 'light'}
+        dangerouslySetInnerHTML={{ __html: html }}
+      />
+    )
+  }
+
   return (
     <div className="markdown-body" data-theme={isDark ? 'dark' : 'light'}>
       <ReactMarkdown
@@ -1,11 +1,9 @@
 import { useState, useEffect } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
-import axios from 'axios'
 import client from '../api/client'
+import { getBootstrap } from '../api/bootstrap'
 import { useTheme } from '../hooks/useTheme'
 
-const publicAxios = axios.create()
-
 export default function Navbar() {
   const navigate = useNavigate()
   const { isDark } = useTheme()
@@ -13,9 +11,8 @@ export default function Navbar() {
   const [navLinks, setNavLinks] = useState([])
 
   useEffect(() => {
-    publicAxios
-      .get('/api/nav-links')
-      .then((res) => setNavLinks(res.data))
+    getBootstrap()
+      .then((data) => setNavLinks(data.nav_links))
       .catch(() => {})
   }, [])
 
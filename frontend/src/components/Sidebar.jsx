@@ -13,7 +13,7 @@ import {
   faBluesky,
 } from '@fortawesome/free-brands-svg-icons'
 import { faGlobe, faRss, faEnvelope } from '@fortawesome/free-solid-svg-icons'
-import client from '../api/client'
+import { getBootstrap } from '../api/bootstrap'
 
 const ICON_MAP = {
   github: faGithub,
@@ -34,9 +34,8 @@ export default function Sidebar() {
   const [links, setLinks] = useState([])
 
   useEffect(() => {
-    client
-      .get('/social-links')
-      .then((res) => setLinks(res.data))
+    getBootstrap()
+      .then((data) => setLinks(data.social_links))
       .catch(() => {})
   }, [])
 
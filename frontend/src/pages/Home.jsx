@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useSearchParams } from 'react-router-dom'
 import client from '../api/client'
+import { getBootstrap } from '../api/bootstrap'
 import PostCard from '../components/PostCard'
 import Sidebar from '../components/Sidebar'
 import LetterboxdWidget from '../components/LetterboxdWidget'
@@ -15,9 +16,13 @@ export default function Home() {
 
   useEffect(() => {
     setLoading(true)
-    client
-      .get('/posts', { params: { page, size: 10 } })
-      .then((res) => setData(res.data))
+    // The first page comes with the bootstrap bundle the layout is already fetching.
+    const request =
+      page === 1
+        ? getBootstrap().then((bundle) => bundle.posts)
+        : client.get('/posts', { params: { page, size: 10 } }).then((res) => res.data)
+    request
+      .then(setData)
       .catch(() => setError('Failed to load posts.'))
       .finally(() => setLoading(false))
   }, [page])
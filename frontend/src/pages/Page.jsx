@@ -29,7 +29,7 @@ export default function Page() {
   return (
     <article className="max-w-none content-card">
       <h1 className="text-3xl font-bold mb-6">{page.title}</h1>
-      <MarkdownRenderer content={page.content} />
+      <MarkdownRenderer html={page.content_html} />
     </article>
   )
 }
@@ -130,7 +130,7 @@ export default function Post() {
                 · · ·
               </p>
             )}
-            <MarkdownRenderer content={post.content} />
+            <MarkdownRenderer html={post.content_html} />
           </div>
         </>
       ) : (
@@ -158,7 +158,7 @@ export default function Post() {
               · · ·
             </p>
           )}
-          <MarkdownRenderer content={post.content} />
+          <MarkdownRenderer html={post.content_html} />
         </>
       )}
     </article>
@@ -7,7 +7,6 @@ export default function BioSettings() {
   const [loading, setLoading] = useState(true)
   const [message, setMessage] = useState(null)
   const [uploading, setUploading] = useState(false)
-  const [photoKey, setPhotoKey] = useState(0)
 
   useEffect(() => {
     client
@@ -30,7 +29,6 @@ export default function BioSettings() {
     try {
       const res = await client.post('/admin/profile/photo', formData)
       setPhotoUrl(res.data.photo_url || '')
-      setPhotoKey((k) => k + 1)
       setMessage({ type: 'success', text: 'Photo uploaded.' })
     } catch {
       setMessage({ type: 'error', text: 'Failed to upload photo.' })
@@ -98,7 +96,7 @@ export default function BioSettings() {
         {photoUrl && (
           <div className="flex flex-col items-center gap-1 pt-5">
             <img
-              src={photoKey ? `${photoUrl}?t=${photoKey}` : photoUrl}
+              src={photoUrl}
               alt="Profile preview"
               className="w-20 h-20 rounded-full object-cover border border-stone-200 dark:border-navy-600"
             />